@@ -0,0 +1,104 @@
+import math
+
+# How an action reacts to its gesture.
+PRESS = 0    # fires once when the gesture starts (click, double click)
+TOGGLE = 1   # starts when the gesture starts, ends when it stops (drag)
+REPEAT = 2   # fires at repeat_rate while the gesture is held (scroll)
+
+ACTION_KINDS = {
+    "click": PRESS,
+    "double_click": PRESS,
+    "drag": TOGGLE,
+    "scroll_up": REPEAT,
+    "scroll_down": REPEAT,
+}
+
+DEFAULT_TIMING = {
+    "press": 0.0,         # seconds a gesture must hold before it counts as started
+    "release": 0.05,      # seconds it must be gone before it counts as stopped
+    "refractory": 0.5,    # seconds after a start during which a new start is ignored
+    "repeat_rate": 30.0,  # REPEAT actions per second while held
+    "max_repeats": 3,     # REPEAT actions per update at most (after a stall)
+}
+
+
+class ActionState:
+    """Debounced, time-driven state of one profile action."""
+    __slots__ = ("action", "kind", "hand", "gesture_index", "press", "release", "refractory",
+                 "repeat_interval", "max_repeats", "on_start", "on_end", "on_repeat",
+                 "active", "engaged", "pending_since", "ready_at", "next_repeat")
+
+    def __init__(self, action, kind, hand, gesture_index, timing, on_start=None, on_end=None, on_repeat=None):
+        self.action = action
+        self.kind = kind
+        self.hand = hand
+        self.gesture_index = gesture_index
+        self.press = timing["press"]
+        self.release = timing["release"]
+        self.refractory = timing["refractory"]
+        self.repeat_interval = 1.0 / timing["repeat_rate"]
+        self.max_repeats = timing["max_repeats"]
+        self.on_start = on_start
+        self.on_end = on_end
+        self.on_repeat = on_repeat
+        self.active = False
+        self.engaged = False
+        self.pending_since = None
+        self.ready_at = -math.inf
+        self.next_repeat = 0.0
+
+    def update(self, raw, now):
+        if raw != self.active:
+            if self.pending_since is None:
+                self.pending_since = now
+            if now - self.pending_since < (self.press if raw else self.release):
+                return
+            self.pending_since = None
+            self.active = raw
+            if raw:
+                self._started(now)
+            elif self.engaged:
+                self.engaged = False
+                if self.on_end:
+                    self.on_end()
+        else:
+            self.pending_since = None
+            if raw and self.kind == REPEAT and self.engaged and now >= self.next_repeat:
+                count = int((now - self.next_repeat) / self.repeat_interval) + 1
+                if count > self.max_repeats:
+                    count = self.max_repeats
+                    self.next_repeat = now + self.repeat_interval
+                else:
+                    self.next_repeat += count * self.repeat_interval
+                self.on_repeat(count)
+
+    def _started(self, now):
+        if self.kind == REPEAT:
+            self.engaged = True
+            self.next_repeat = now + self.repeat_interval
+            self.on_repeat(1)
+            return
+        if now < self.ready_at:
+            return
+        self.ready_at = now + self.refractory
+        # PRESS actions have nothing to end; TOGGLE ones end when the gesture stops.
+        self.engaged = self.kind == TOGGLE
+        if self.on_start:
+            self.on_start()
+
+    def reset(self):
+        """Ends an engaged action (e.g. releases a drag) and forgets the gesture state."""
+        if self.engaged and self.kind == TOGGLE and self.on_end:
+            self.on_end()
+        self.active = False
+        self.engaged = False
+        self.pending_since = None
+
+
+def action_timing(settings, action):
+    """DEFAULT_TIMING overridden by main_config "gesture_timing" and its per-action "actions" entry."""
+    settings = settings or {}
+    timing = dict(DEFAULT_TIMING)
+    timing.update({key: value for key, value in settings.items() if key in DEFAULT_TIMING})
+    timing.update(settings.get("actions", {}).get(action, {}))
+    return timing
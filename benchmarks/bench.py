@@ -0,0 +1,325 @@
+"""Hot-path benchmarks with fake OS backends.
+
+Usage (from the repository root):
+    python -m benchmarks.bench                       # run everything
+    python -m benchmarks.bench --images DIR          # time find_hands on these images instead of the fixtures
+    python -m benchmarks.bench --write-fixtures      # regenerate benchmarks/fixtures/hands
+    python -m benchmarks.bench --save NAME           # store results as a baseline
+    python -m benchmarks.bench --compare NAME        # diff against a stored baseline
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.fakes import FakeCLI, install_display_fakes, install_input_fakes
+
+install_input_fakes()
+install_display_fakes()
+
+import camera_pipeline  # noqa: E402
+from frame_sources import ImageDirSource, LandmarkStreamSource, SessionRecorder, FramePacket  # noqa: E402
+from json_manager import JsonManager  # noqa: E402
+from mouse_controller import MouseController  # noqa: E402
+from preset_gestures import GESTURES_FILE, GestureEngine, PresetGestures  # noqa: E402
+from gesture_classifier import MODEL_FILE, GestureClassifier, landmark_features  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+# Hand frames for find_hands; regenerate with --write-fixtures.
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "hands")
+FRAME_SHAPE = (480, 640, 3)
+
+
+def measure(fn, min_time=0.5, min_calls=20):
+    """Calls ``fn`` repeatedly and returns per-call statistics in microseconds."""
+    fn()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_calls or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    median = statistics.median(samples)
+    return {
+        "calls": len(samples),
+        "median_us": round(median * 1e6, 3),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 3),
+        "fps": round(1.0 / median, 1) if median else None,
+    }
+
+
+def synthetic_hand(rng):
+    """A loose hand-shaped cloud of 21 normalized landmarks near the frame center."""
+    return (0.5 + rng.normal(0.0, 0.06, size=(21, 3))).astype(np.float32)
+
+
+def bench_zoom(results):
+    frame = np.random.default_rng(0).integers(0, 255, FRAME_SHAPE, dtype=np.uint8)
+    for scale in (1.0, 1.5, 2.0, 3.0):
+        results[f"zoom_frame[{scale}]"] = measure(lambda: camera_pipeline.zoom_frame(frame, scale))
+
+
+def bench_gestures(results, json_manager):
+    rng = np.random.default_rng(1)
+    points = synthetic_hand(rng)
+    landmarks = [(i, x, y, z) for i, (x, y, z) in enumerate(points.tolist())]
+    gestures = PresetGestures(landmarks, 640, 480, json_manager)
+    for check in ("touch", "group_touch", "fist_index_up"):
+        name = next(g["name"] for g in json_manager.load_gestures() if g["check"] == check)
+        results[f"PresetGestures.detect[{check}]"] = measure(lambda: gestures.detect(name))
+
+    for mode, profile in json_manager.load_profiles().items():
+        engine = GestureEngine(profile, json_manager)
+        results[f"GestureEngine.evaluate[{mode}]"] = measure(lambda: engine.evaluate(points, 640, 480))
+
+    # Batched evaluation: cost per frame should grow much slower than the hand count.
+    engine = GestureEngine(json_manager.load_profiles()["touch"], json_manager)
+    for count in (1, 2, 4):
+        hands = np.stack([synthetic_hand(rng) for _ in range(count)])
+        results[f"GestureEngine.evaluate_batch[{count} hands]"] = measure(
+            lambda: engine.evaluate_batch(hands, 640, 480))
+
+    # Classifier checks: 1000 stored samples, every label voted on by one product.
+    labels = ["none", "open", "pinch", "peace"]
+    features = landmark_features(np.stack([synthetic_hand(rng) for _ in range(1000)]), 640, 480)
+    classifier = GestureClassifier.fit(features, [labels[i % len(labels)] for i in range(len(features))])
+    with tempfile.TemporaryDirectory() as path:
+        model_manager = JsonManager(path)
+        model_manager.save_json(GESTURES_FILE, [{"name": name, "check": "classifier"} for name in labels[1:]])
+        model_manager.save_json(MODEL_FILE, classifier.to_dict())
+        model_manager.flush()
+        engine = GestureEngine({name: name for name in labels[1:]}, model_manager)
+    hands = np.stack([synthetic_hand(rng) for _ in range(2)])
+    results["GestureEngine.evaluate_batch[classifier]"] = measure(lambda: engine.evaluate_batch(hands, 640, 480))
+
+
+def bench_mouse(results):
+    mouse = MouseController(640, 480, smoothing=7)
+    results["MouseController.convert_coordinates"] = measure(lambda: mouse.convert_coordinates(320, 240))
+    results["MouseController.smooth_move"] = measure(lambda: mouse.smooth_move(320, 240))
+    mouse.close()
+    sync_mouse = MouseController(640, 480, smoothing=7, asynchronous=False)
+    results["MouseController.smooth_move[sync]"] = measure(lambda: sync_mouse.smooth_move(320, 240))
+
+
+def render_hand(rng, scale=1.0, shift=(0, 0), angle=0.0):
+    """A shaded open right hand on a plain wall; MediaPipe detects these, unlike flat shapes."""
+    import cv2
+
+    height, width = FRAME_SHAPE[:2]
+    background = np.full(FRAME_SHAPE, (150, 160, 170), dtype=np.float32) + rng.normal(0.0, 4.0, FRAME_SHAPE)
+    mask = np.zeros((height, width), dtype=np.uint8)
+    cx, cy = 320 + shift[0], 330 + shift[1]
+    cos, sin = np.cos(np.radians(angle)), np.sin(np.radians(angle))
+
+    def point(x, y):
+        return int(cx + (x * cos - y * sin) * scale), int(cy + (x * sin + y * cos) * scale)
+
+    palm = [(-65, -55), (-25, -70), (20, -70), (60, -55), (65, 40), (35, 100), (-35, 100), (-70, 30)]
+    cv2.fillPoly(mask, [np.array([point(x, y) for x, y in palm], dtype=np.int32)], 255)
+    wrist = [(-40, 90), (35, 90), (40, 250), (-45, 250)]
+    cv2.fillPoly(mask, [np.array([point(x, y) for x, y in wrist], dtype=np.int32)], 255)
+    # (base, tip, half width): pinky, ring, middle, index, thumb
+    fingers = [((-48, -55), (-95, -190), 17), ((-15, -62), (-25, -225), 18), ((20, -62), (28, -232), 18),
+               ((52, -52), (85, -200), 16), ((-65, 15), (-160, -50), 20)]
+    for base, tip, half_width in fingers:
+        cv2.line(mask, point(*base), point(*tip), 255, int(2 * half_width * scale))
+        cv2.circle(mask, point(*tip), int(half_width * scale), 255, cv2.FILLED)
+
+    # Darker towards the outline, so fingers read as round.
+    shade = np.sqrt(np.clip(cv2.distanceTransform(mask, cv2.DIST_L2, 5) / 12.0, 0.0, 1.0))
+    skin = np.array((105, 145, 205), dtype=np.float32) * (0.55 + 0.45 * shade[..., None])
+    frame = np.where(mask[..., None] > 0, skin, background)
+    return cv2.GaussianBlur(frame, (3, 3), 0).clip(0, 255).astype(np.uint8)
+
+
+def write_hand_fixtures(path=FIXTURE_DIR, count=8, seed=4):
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(path, exist_ok=True)
+    for i in range(count):
+        frame = render_hand(rng, scale=0.9 + 0.1 * (i % 3), shift=(10 * i - 30, 0), angle=5 * (i - 4))
+        cv2.imwrite(os.path.join(path, f"hand_{i:02d}.jpg"), frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+
+
+def moving_hand_frames(count=90, seed=5):
+    """A smaller hand sweeping across the frame and back, for ROI tracking."""
+    rng = np.random.default_rng(seed)
+    path = [int(-150 + 300 * abs(1.0 - 2.0 * i / count)) for i in range(count)]
+    return [render_hand(rng, scale=0.5, shift=(x, -60)) for x in path]
+
+
+def time_find_hands(results, name, frames, **tracker_args):
+    from hand_tracker import HandTracker
+
+    tracker = HandTracker(max_hands=1, **tracker_args)
+    index = [0]
+    found = [0]
+
+    def step():
+        tracker.find_hands(frames[index[0] % len(frames)], draw=False)
+        index[0] += 1
+        found[0] += tracker.hand_count > 0
+
+    timing = measure(step, min_time=2.0)
+    tracker.close()
+    print(f"{name}: a hand was found in {found[0]} of {index[0]} frames")
+    if not found[0]:
+        # Only palm detection ran: never report that as the hand tracking time.
+        print(f"WARNING: no hand detected for {name}; landmark inference was not measured")
+        name += "[no hand found]"
+    results[name] = timing
+
+
+def bench_find_hands(results, images=None):
+    try:
+        from hand_tracker import load_mediapipe
+        load_mediapipe()
+    except ImportError as e:
+        print(f"skip find_hands: {e}")
+        return
+    source = ImageDirSource(images or FIXTURE_DIR)
+    time_find_hands(results, "HandTracker.find_hands", [packet.frame for packet in iter(source.read, None)])
+
+    moving = moving_hand_frames()
+    time_find_hands(results, "HandTracker.find_hands[moving]", moving)
+    time_find_hands(results, "HandTracker.find_hands[moving, roi]", moving, roi_tracking=True)
+
+
+class TimedSource(LandmarkStreamSource):
+    def read(self):
+        packet = super().read()
+        now = time.perf_counter()
+        if self.index == 1:
+            self.started = now
+        if packet is None:
+            self.finished = now
+        return packet
+
+
+def bench_run_camera(results, json_manager, frames=300):
+    rng = np.random.default_rng(2)
+    with tempfile.TemporaryDirectory() as path:
+        recorder = SessionRecorder(path)
+        for i in range(frames):
+            packet = FramePacket(None, i / 30.0, i)
+            recorder.write_landmarks(packet, 640, 480, synthetic_hand(rng)[None])
+        recorder.close()
+
+        runs = [(mode, profile, False) for mode, profile in json_manager.load_profiles().items()]
+        runs.append(("touch", json_manager.load_profiles()["touch"], True))
+        for mode, profile, headless in runs:
+            source = TimedSource(path)
+            camera_pipeline.run_camera(FakeCLI(profile, mode), json_manager, source_spec=source, headless=headless)
+            elapsed = source.finished - source.started
+            name = f"run_camera[{mode}{', headless' if headless else ''}]"
+            results[name] = {
+                "calls": frames,
+                "median_us": round(elapsed / frames * 1e6, 3),
+                "mean_us": round(elapsed / frames * 1e6, 3),
+                "fps": round(frames / elapsed, 1),
+            }
+
+
+def bench_session(results, json_manager, restarts=20):
+    """Time from CameraSession.resume() to the first processed frame, cold and warm."""
+    rng = np.random.default_rng(3)
+    with tempfile.TemporaryDirectory() as path:
+        recorder = SessionRecorder(path)
+        for i in range(30):
+            recorder.write_landmarks(FramePacket(None, i / 30.0, i), 640, 480, synthetic_hand(rng)[None])
+        recorder.close()
+
+        profile = json_manager.load_profiles()["touch"]
+        session = camera_pipeline.CameraSession(FakeCLI(profile, "touch"), json_manager,
+                                                source_spec=LandmarkStreamSource(path, loop=True), headless=True)
+
+        def restart():
+            processed = session.metrics.counter("processed") if session.opened else 0
+            started = time.perf_counter()
+            session.resume()
+            while session.metrics.counter("processed") <= processed:
+                time.sleep(0.0005)
+            elapsed = time.perf_counter() - started
+            session.pause()
+            return elapsed
+
+        for name, samples in (("cold", [restart()]), ("warm", [restart() for _ in range(restarts)])):
+            median = statistics.median(samples)
+            results[f"CameraSession.resume[{name}]"] = {
+                "calls": len(samples),
+                "median_us": round(median * 1e6, 3),
+                "mean_us": round(statistics.fmean(samples) * 1e6, 3),
+                "fps": None,
+            }
+        session.close()
+
+
+def compare(results, baseline):
+    print(f"\n{'benchmark':<42} {'base us':>10} {'now us':>10} {'change':>8}")
+    for name, entry in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"{name:<42} {'-':>10} {entry['median_us']:>10.2f} {'new':>8}")
+            continue
+        change = (entry["median_us"] / base["median_us"] - 1.0) * 100.0 if base["median_us"] else 0.0
+        print(f"{name:<42} {base['median_us']:>10.2f} {entry['median_us']:>10.2f} {change:>+7.1f}%")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="Benchmark the camera mouse hot paths")
+    parser.add_argument("--images", help="directory with hand images for find_hands (default: benchmarks/fixtures/hands)")
+    parser.add_argument("--write-fixtures", action="store_true", help="regenerate the find_hands fixture frames and exit")
+    parser.add_argument("--frames", type=int, default=300, help="frames per run_camera replay")
+    parser.add_argument("--save", metavar="NAME", help="store results as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against baselines/NAME.json")
+    parser.add_argument("--only", help="run only benchmarks whose group contains this text")
+    args = parser.parse_args()
+    if args.write_fixtures:
+        write_hand_fixtures()
+        return
+
+    json_manager = JsonManager()
+    groups = {
+        "zoom": lambda r: bench_zoom(r),
+        "gestures": lambda r: bench_gestures(r, json_manager),
+        "mouse": lambda r: bench_mouse(r),
+        "find_hands": lambda r: bench_find_hands(r, args.images),
+        "run_camera": lambda r: bench_run_camera(r, json_manager, args.frames),
+        "session": lambda r: bench_session(r, json_manager),
+    }
+    results = {}
+    for name, run in groups.items():
+        if args.only and args.only not in name:
+            continue
+        run(results)
+
+    print(f"{'benchmark':<42} {'median us':>10} {'mean us':>10} {'fps':>10}")
+    for name, entry in results.items():
+        print(f"{name:<42} {entry['median_us']:>10.2f} {entry['mean_us']:>10.2f} {entry['fps'] or 0:>10.1f}")
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json"), encoding="utf-8") as file:
+            compare(results, json.load(file))
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        document = {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "results": results,
+        }
+        with open(os.path.join(BASELINE_DIR, f"{args.save}.json"), "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=4)
+
+
+if __name__ == "__main__":
+    main_bench()
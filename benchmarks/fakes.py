@@ -0,0 +1,68 @@
+"""In-process stand-ins for the OS backends so benchmarks run on a headless box."""
+import sys
+import types
+
+
+class _FakeAutopyMouse(types.ModuleType):
+    class Button:
+        LEFT = "left"
+        RIGHT = "right"
+
+    def __init__(self):
+        super().__init__("autopy.mouse")
+        self.calls = 0
+
+    def move(self, x, y):
+        self.calls += 1
+
+    def click(self, button=None):
+        self.calls += 1
+
+    def toggle(self, button=None, down=True):
+        self.calls += 1
+
+
+class _FakePynputController:
+    def __init__(self):
+        self.calls = 0
+
+    def scroll(self, dx, dy):
+        self.calls += 1
+
+
+def install_input_fakes(screen_size=(1920, 1080)):
+    """Registers fake ``autopy`` and ``pynput.mouse`` modules; call before importing mouse_controller."""
+    autopy = types.ModuleType("autopy")
+    autopy.mouse = _FakeAutopyMouse()
+    autopy.screen = types.ModuleType("autopy.screen")
+    autopy.screen.size = lambda: screen_size
+    sys.modules["autopy"] = autopy
+    sys.modules["autopy.mouse"] = autopy.mouse
+    sys.modules["autopy.screen"] = autopy.screen
+
+    pynput = types.ModuleType("pynput")
+    pynput.mouse = types.ModuleType("pynput.mouse")
+    pynput.mouse.Controller = _FakePynputController
+    sys.modules["pynput"] = pynput
+    sys.modules["pynput.mouse"] = pynput.mouse
+
+
+def install_display_fakes():
+    import cv2
+
+    cv2.imshow = lambda name, frame: None
+    cv2.waitKey = lambda delay=0: -1
+    cv2.destroyWindow = lambda name: None
+    cv2.destroyAllWindows = lambda: None
+
+
+class FakeCLI:
+    """The parts of CLIManager that run_camera uses."""
+
+    def __init__(self, profile, mode="bench"):
+        self.mode = mode
+        self.current_profile = profile
+        self.main_config = {"scale": 1.5}
+
+    def persist_state(self):
+        pass
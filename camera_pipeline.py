@@ -0,0 +1,743 @@
+import time
+import threading
+import cv2
+import numpy as np
+from hand_tracker import HandTracker, ReplayHandTracker, draw_landmarks, load_mediapipe
+from frame_sources import open_source, SessionRecorder
+from frame_mailbox import FrameMailbox
+from frame_pool import FramePool
+from overlay import FONT, OverlayRenderer
+from zoom_transform import ZoomTransform
+from multiprocess_pipeline import MultiProcessSource
+from pipeline_metrics import PipelineMetrics, MetricsDumper
+from sampling_profiler import SamplingProfiler
+from mouse_controller import MouseController
+from cursor_filters import create_filter
+from quality_governor import QualityGovernor
+from power_saver import PowerSaver
+from preset_gestures import GestureEngine, parse_binding
+from event_bus import EventBus, ACTION, CAMERA_STATUS, GESTURE, METRICS
+from action_states import ActionState, ACTION_KINDS, action_timing
+
+# HandTracker built by preload() for the first CameraSession; see _take_preloaded_tracker().
+_preload_lock = threading.Lock()
+_preloaded = {"settings": None, "tracker": None, "claimed": False}
+
+def tracker_settings(config, profile):
+    """HandTracker arguments for ``profile``: both hands when actions are bound to left/right."""
+    per_hand = any(parse_binding(value)[1] != "any" for value in profile.values())
+    return {"max_hands": config.get("max_hands", 2 if per_hand else 1),
+            "roi_tracking": config.get("roi_tracking", False)}
+
+def preload(config=None, profile=None):
+    """Imports MediaPipe and, given a profile, builds a warm HandTracker for the first session (GUI start-up)."""
+    # Held for the whole preload, import included, so an open() that starts
+    # meanwhile waits for it instead of loading MediaPipe alongside it.
+    with _preload_lock:
+        if _preloaded["claimed"]:
+            return
+        load_mediapipe()
+        if profile is None or config.get("multiprocess", False):
+            return
+        settings = tracker_settings(config, profile)
+        tracker = HandTracker(mirror=True, **settings)
+        # MediaPipe loads its models on the first process() call, not when the graph is built.
+        tracker.find_hands(np.zeros((480, 640, 3), dtype=np.uint8), draw=False)
+        _preloaded.update(settings=settings, tracker=tracker)
+
+def _take_preloaded_tracker(settings):
+    """The preloaded tracker if it was built with ``settings``, else None; waits for a running preload."""
+    with _preload_lock:
+        tracker, built_with = _preloaded["tracker"], _preloaded["settings"]
+        _preloaded.update(tracker=None, claimed=True)
+    if tracker is not None and built_with != settings:
+        tracker.close()
+        return None
+    return tracker
+
+def zoom_frame(frame, scale=1.5, dst=None):
+    # Only needed for the preview: tracking applies the zoom to coordinates.
+    if scale <= 1.0:
+        return frame
+    h, w = frame.shape[:2]
+    x0, y0, x1, y1 = ZoomTransform(scale).crop_rect(w, h)
+    return cv2.resize(frame[y0:y1, x0:x1], (w, h), dst=dst, interpolation=cv2.INTER_LINEAR)
+
+class ScaleController:
+    def __init__(self, initial_scale=1.5):
+        self.scale = initial_scale
+        self.lock = threading.Lock()
+        self._transform = ZoomTransform(max(1.0, initial_scale))
+    
+    def get(self):
+        with self.lock:
+            return self.scale
+
+    def transform(self):
+        with self.lock:
+            return self._transform
+    
+    def set(self, value):
+        with self.lock:
+            self.scale = max(1.0, min(3.0, value))
+            self._transform = ZoomTransform(self.scale)
+    
+    def increment(self, delta):
+        with self.lock:
+            self.scale = max(1.0, min(3.0, self.scale + delta))
+            self._transform = ZoomTransform(self.scale)
+
+class VideoThread:
+    def __init__(self, source, metrics, recorder=None):
+        self.source = source
+        self.metrics = metrics
+        self.recorder = recorder
+        self.running = True
+        # 0 means capture as fast as the source delivers.
+        self.frame_interval = 0.0
+        self._rate_changed = threading.Event()
+        # Cleared while the session is paused; the device stays open.
+        self._resumed = threading.Event()
+        self._resumed.set()
+
+    def set_frame_rate(self, fps):
+        self.frame_interval = 1.0 / fps if fps else 0.0
+        self._rate_changed.set()
+
+    def pause(self):
+        self._resumed.clear()
+
+    def resume(self):
+        self._resumed.set()
+
+    def run(self, frame_mailbox):
+        while self.running:
+            self._resumed.wait()
+            if not self.running:
+                break
+            packet = self.source.read()
+            if packet is None:
+                # End of a replayed source: let the consumer drain and stop.
+                frame_mailbox.close()
+                break
+
+            dropped = self.source.take_dropped()
+            if dropped:
+                self.metrics.count("dropped", dropped)
+
+            if self.recorder:
+                self.recorder.write_frame(packet)
+
+            # No mirroring here: the tracker mirrors landmarks and the
+            # display flips while it copies the frame for the preview.
+            if not self.source.live:
+                while self.running and frame_mailbox.put(packet, block=True, timeout=0.1) is packet:
+                    continue
+                continue
+
+            replaced = frame_mailbox.put(packet)
+            if replaced is not None:
+                replaced.release()
+                self.metrics.count("dropped")
+
+            if self.frame_interval:
+                # Throttled (idle) capture; set_frame_rate() cuts the wait short.
+                self._rate_changed.wait(self.frame_interval)
+                self._rate_changed.clear()
+
+    def stop(self):
+        """Asks run() to return; the caller joins the thread before releasing the source."""
+        self.running = False
+        self._rate_changed.set()
+        self._resumed.set()
+
+WINDOW_NAME = "AI Hand Mouse CLI"
+SCROLL_STEP = 0.7
+
+# (action, active) -> overlay text, position, color, duration
+ACTION_MESSAGES = {
+    ("click", True): ("CLICK!", (50, 50), (0, 0, 255), 0.7),
+    ("double_click", True): ("DCLICK!", (50, 80), (255, 0, 255), 0.7),
+    ("drag", True): ("DRAG ON", (50, 110), (0, 255, 255), 0.7),
+    ("drag", False): ("DRAG OFF", (50, 110), (0, 165, 255), 0.7),
+    ("scroll_down", True): ("SCROLL DWON", (50, 200), (0, 255, 0), 0.2),
+    ("scroll_up", True): ("SCROLL UP", (50, 230), (255, 255, 0), 0.2),
+}
+PROFILE_MESSAGE_POSITION = (50, 260)
+
+class DisplayThread:
+    def __init__(self, frame_mailbox, scale_controller, metrics, show_metrics=False,
+                 preview_scale=1.0, preview_fps=0, show_center=False, bus=None, mirror=False, profiler=None):
+        self.frame_mailbox = frame_mailbox
+        self.scale_controller = scale_controller
+        self.metrics = metrics
+        self.show_metrics = show_metrics
+        # The preview is drawn on its own (optionally smaller) copy, never on
+        # the pipeline frame, and rendered at most preview_fps times a second.
+        self.preview_scale = preview_scale
+        self.min_interval = 1.0 / preview_fps if preview_fps else 0.0
+        self.show_center = show_center
+        # Unmirrored frames are flipped into the preview copy.
+        self.mirror = mirror
+        # name -> preview buffer, reused while the frame size stays the same.
+        self._buffers = {}
+        self._last_render = 0.0
+        self.running = True
+        # While hidden (session paused) the window is closed but the thread stays up.
+        self.visible = True
+        self._window_open = False
+        self.overlay = OverlayRenderer()
+        # 'p' starts/stops a SamplingProfiler capture.
+        self.profiler = profiler
+        self.bus = bus
+        if bus:
+            bus.subscribe(ACTION, self._on_action)
+
+    def add_ui_command(self, text, position, color, duration=0.7):
+        """Thread-safe; a new message at the same position replaces the old one."""
+        self.overlay.post(text, position, color, duration)
+
+    def _on_action(self, event):
+        message = ACTION_MESSAGES.get((event.data["action"], event.data["active"]))
+        if message:
+            self.add_ui_command(*message)
+
+    def _buffer(self, name, height, width):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape[:2] != (height, width):
+            buffer = self._buffers[name] = np.empty((height, width, 3), dtype=np.uint8)
+        return buffer
+
+    def _preview(self, frame):
+        """The (scaled, mirrored) preview copy of ``frame``, drawn into a reused buffer."""
+        h, w = frame.shape[:2]
+        s = self.preview_scale
+        if s != 1.0:
+            w, h = max(1, round(w * s)), max(1, round(h * s))
+            canvas = cv2.resize(frame, (w, h), dst=self._buffer("preview", h, w), interpolation=cv2.INTER_AREA)
+            if self.mirror:
+                cv2.flip(canvas, 1, dst=canvas)
+            return canvas
+        canvas = self._buffer("preview", h, w)
+        if self.mirror:
+            # The flip doubles as the copy.
+            return cv2.flip(frame, 1, dst=canvas)
+        np.copyto(canvas, frame)
+        return canvas
+
+    def _toggle_profile(self):
+        if self.profiler.toggle():
+            self.add_ui_command("PROFILING", PROFILE_MESSAGE_POSITION, (0, 128, 255), self.profiler.duration)
+        else:
+            self.add_ui_command("PROFILE SAVED", PROFILE_MESSAGE_POSITION, (0, 200, 0), 1.5)
+
+    def hide(self):
+        self.visible = False
+
+    def show(self):
+        self.visible = True
+
+    def run(self):
+        while self.running:
+            packet = None
+            try:
+                packet = self.frame_mailbox.get(timeout=0.1)
+                if not self.visible and self._window_open:
+                    # HighGUI calls must stay on this thread.
+                    cv2.destroyWindow(WINDOW_NAME)
+                    cv2.waitKey(1)
+                    self._window_open = False
+                if packet is None:
+                    continue
+                now = time.monotonic()
+                if not self.visible or now - self._last_render < self.min_interval:
+                    packet.release()
+                    continue
+                self._last_render = now
+
+                s = self.preview_scale
+                frame = self._preview(packet.frame)
+                # The pipeline frame is not touched after this copy.
+                packet.release()
+                if packet.landmarks is not None:
+                    draw_landmarks(frame, packet.landmarks, center=self.show_center)
+                current_scale = self.scale_controller.get()
+                if current_scale > 1.0:
+                    frame = zoom_frame(frame, current_scale, self._buffer("zoom", *frame.shape[:2]))
+                
+                self.overlay.text(frame, f"ZOOM: {current_scale:.2f}x [+/-]", (10, 30), (200, 200, 255), 0.9 * s, 2)
+                self.overlay.render(frame, s)
+
+                if self.show_metrics:
+                    # These numbers change every frame, so a cached sprite would never be reused.
+                    for i, line in enumerate(self.metrics.overlay_lines()):
+                        cv2.putText(frame, line, (10, frame.shape[0] - 12 - 18 * i), FONT, 0.45, (255, 255, 255), 1,
+                                    cv2.LINE_AA)
+                
+                cv2.imshow(WINDOW_NAME, frame)
+                self._window_open = True
+                key = cv2.waitKey(1) & 0xFF
+                packet.mark("display")
+                self.metrics.record(packet)
+                
+                if key == ord('+') or key == ord('='):
+                    self.scale_controller.increment(0.1)
+                elif key == ord('-'):
+                    self.scale_controller.increment(-0.1)
+                elif key == ord('m'):
+                    self.show_metrics = not self.show_metrics
+                elif key == ord('p') and self.profiler:
+                    self._toggle_profile()
+                elif key == ord('q'):
+                    self.running = False
+            except:
+                if packet is not None:
+                    packet.release()
+                continue
+        if self._window_open:
+            # Destroyed here, not by whoever stopped this thread: HighGUI is not thread-safe.
+            cv2.destroyWindow(WINDOW_NAME)
+            cv2.waitKey(1)
+            self._window_open = False
+        if self.bus:
+            self.bus.unsubscribe(self._on_action)
+
+    def stop(self):
+        self.running = False
+
+class CameraSession:
+    """Camera, hand tracker, pipeline threads and mouse output kept warm between runs."""
+
+    def __init__(self, cli, json_manager, source_spec=None, record_path=None, show_metrics=False,
+                 metrics_path=None, multiprocess=False, headless=False, release_after=None, bus=None,
+                 metrics_interval=1.0, profile_seconds=None):
+        self.cli = cli
+        self.bus = bus or EventBus()
+        self.metrics_interval = metrics_interval
+        self.json_manager = json_manager
+        self.source_spec = source_spec
+        self.record_path = record_path
+        self.show_metrics = show_metrics
+        self.metrics_path = metrics_path
+        self.multiprocess = multiprocess
+        self.headless = headless
+        self.release_after = release_after
+        # Seconds of sampling profile to capture once tracking starts (--profile).
+        self.profile_seconds = profile_seconds
+        profiler_settings = cli.main_config.get("profiler", {})
+        self.profiler = SamplingProfiler(profile_seconds or profiler_settings.get("duration", 10.0),
+                                         profiler_settings.get("interval", 0.005),
+                                         profiler_settings.get("output_dir", "profiles"))
+        self.opened = False
+        # Set when a replayed source runs out; the next resume reopens it.
+        self.finished = threading.Event()
+        self._lock = threading.RLock()
+        # Stop flag of the current tracking worker; every resume() gets a new one.
+        self._stop = threading.Event()
+        self._worker = None
+        self._release_timer = None
+        self._generation = 0
+
+    def open(self):
+        with self._lock:
+            if self.opened:
+                return
+            # What open() has started so far, for _close_partial().
+            self.dumper = self.source = self.recorder = self.tracker = None
+            self.video_thread = self.display_thread = self.display_t = None
+            try:
+                config = self.cli.main_config
+                self.profile = self.cli.current_profile
+                self.scale_controller = ScaleController(config.get("scale", 1.5))
+                self.metrics = PipelineMetrics()
+                if self.metrics_path:
+                    self.dumper = MetricsDumper(self.metrics, self.metrics_path, config.get("metrics_interval", 5.0))
+                    self.dumper.start()
+                self.gesture_engine = GestureEngine(self.profile, self.json_manager,
+                                                    hysteresis=config.get("gesture_timing", {}).get("hysteresis", 1.0))
+                settings = tracker_settings(config, self.profile)
+                max_hands = settings["max_hands"]
+                camera_id = config.get("camera_id", 0)
+                roi_tracking = settings["roi_tracking"]
+                if self.multiprocess or config.get("multiprocess", False):
+                    # Capture and MediaPipe run in their own processes; packets arrive with landmarks.
+                    self.source = MultiProcessSource(self.source_spec, camera_id, max_hands=max_hands,
+                                                     roi_tracking=roi_tracking,
+                                                     governor_settings=config.get("quality_governor"),
+                                                     capture_settings=config.get("capture"))
+                else:
+                    self.source = open_source(self.source_spec, camera_id, capture=config.get("capture"))
+                self.recorder = SessionRecorder(self.record_path) if self.record_path else None
+
+                # Frames are decoded into a few preallocated buffers that travel
+                # with their packets: capture, two mailboxes, tracking, preview.
+                self.pool = FramePool(6, self.metrics)
+                self.source.use_pool(self.pool)
+                self.raw_frame_mailbox = FrameMailbox()
+                self.display_mailbox = FrameMailbox()
+
+                # for Mediapipe; starts paused until resume()
+                self.video_thread = VideoThread(self.source, self.metrics, self.recorder)
+                self.video_thread.pause()
+                self.video_t = threading.Thread(target=self.video_thread.run, args=(self.raw_frame_mailbox,),
+                                                name="capture", daemon=True)
+                self.video_t.start()
+
+                if not self.headless:
+                    self._start_display(self.show_metrics)
+                    self.display_thread.hide()
+
+                preloaded = _take_preloaded_tracker(None if self.source.preprocessed else settings)
+                if self.source.preprocessed:
+                    self.tracker = ReplayHandTracker(max_hands=max_hands)
+                else:
+                    self.tracker = preloaded or HandTracker(mirror=True, **settings)
+                preprocessed = self.source.preprocessed
+                self.governor = None if preprocessed else QualityGovernor.from_config(config.get("quality_governor"))
+                self.power_saver = None if preprocessed else PowerSaver.from_config(config.get("power_save"))
+                filter_settings = config.get("cursor_filter", {})
+                self.mouse = MouseController(
+                    640, 480, smoothing=7, scale_controller=self.scale_controller, metrics=self.metrics,
+                    cursor_filter=create_filter(filter_settings, smoothing=7),
+                    prediction=filter_settings.get("prediction", False),
+                    prediction_lead=filter_settings.get("prediction_lead", 0.0),
+                    output_rate=filter_settings.get("output_rate", 0)
+                )
+                self.finished.clear()
+                self.opened = True
+            except BaseException:
+                self._close_partial()
+                raise
+
+    def _close_partial(self):
+        # Undoes a failed open(), in _shutdown's order, so a retry starts clean.
+        if self.display_thread:
+            self.display_thread.stop()
+        if self.video_thread:
+            self.video_thread.stop()
+            self.raw_frame_mailbox.close()
+            self.video_t.join(timeout=1.0)
+        if self.source:
+            self.source.release()
+        if self.recorder:
+            self.recorder.close()
+        if self.dumper:
+            self.dumper.stop()
+        if self.tracker:
+            self.tracker.close()
+        if self.display_thread:
+            self.display_t.join(timeout=1.0)
+
+    def _start_display(self, show_metrics):
+        # Showed video and check keys
+        preview = self.cli.main_config.get("preview", {})
+        self.display_thread = DisplayThread(
+            self.display_mailbox, self.scale_controller, self.metrics, show_metrics,
+            preview_scale=preview.get("scale", 1.0), preview_fps=preview.get("fps", 0),
+            show_center="mouse_move" in self.profile, bus=self.bus, mirror=not self.source.preprocessed,
+            profiler=self.profiler
+        )
+        self.display_t = threading.Thread(target=self.display_thread.run, name="display", daemon=True)
+        self.display_t.start()
+
+    def _start_capture(self):
+        if self.display_thread:
+            if not self.display_t.is_alive():
+                # Closed with 'q' during the previous run.
+                self._start_display(self.display_thread.show_metrics)
+            self.display_thread.show()
+        # Drop a frame left over from before the pause.
+        leftover = self.raw_frame_mailbox.get(timeout=0)
+        if leftover is not None:
+            leftover.release()
+        if self.power_saver and self.power_saver.idle:
+            self.power_saver.wake(time.monotonic())
+            self.video_thread.set_frame_rate(0)
+        self.video_thread.resume()
+        if self.profile_seconds:
+            # Only the first run; later ones are started with 'p'.
+            self.profile_seconds = None
+            self.profiler.start()
+
+    def resume(self, on_ready=None):
+        """Starts (or restarts) tracking on a background thread."""
+        with self._lock:
+            self._generation += 1
+            self._cancel_release()
+            if self.finished.is_set():
+                self._shutdown()
+            self.open()
+            if self._worker and self._worker.is_alive():
+                if not self._stop.is_set():
+                    return
+                # A paused worker still finishing a slow frame (e.g. a quality
+                # change rebuilding the graph) must not share the tracker.
+                self._worker.join()
+            self._start_capture()
+            self._stop = threading.Event()
+            self._worker = threading.Thread(target=self.run, args=(self._stop,), name="tracking", daemon=True)
+            self._worker.start()
+        self.bus.publish(CAMERA_STATUS, running=True)
+        if on_ready:
+            on_ready()
+
+    def pause(self):
+        """Stops tracking but keeps the device, graph and threads for the next resume."""
+        with self._lock:
+            if not self.opened:
+                return
+            self._generation += 1
+            self._stop.set()
+            if self._worker:
+                # Kept if still alive after the timeout, so resume() can wait for it.
+                self._worker.join(timeout=1.0)
+            self.video_thread.pause()
+            if self.display_thread:
+                self.display_thread.hide()
+            if self.release_after:
+                self._release_timer = threading.Timer(self.release_after, self._release_idle, args=(self._generation,))
+                self._release_timer.daemon = True
+                self._release_timer.start()
+        self.bus.publish(CAMERA_STATUS, running=False)
+        print("Camera paused")
+
+    def _cancel_release(self):
+        if self._release_timer:
+            self._release_timer.cancel()
+            self._release_timer = None
+
+    def _release_idle(self, generation):
+        with self._lock:
+            # A resume (or another pause) since this timer was armed wins.
+            if generation != self._generation:
+                return
+            self._release_timer = None
+            self.close()
+
+    def run(self, stop_flag=None):
+        """Processes frames until ``stop_flag`` is set or the source ends."""
+        cli = self.cli
+        tracker = self.tracker
+        mouse = self.mouse
+        metrics = self.metrics
+        governor = self.governor
+        power_saver = self.power_saver
+        recorder = self.recorder
+        video_thread = self.video_thread
+        scale_controller = self.scale_controller
+        gesture_engine = self.gesture_engine
+        raw_frame_mailbox = self.raw_frame_mailbox
+        display_mailbox = self.display_mailbox
+        bus = self.bus
+        publish = bus.publish
+        gestures_before = {}
+        metrics_since = time.monotonic()
+        processed_before = metrics.counter("processed")
+
+        print("=== Mode:", cli.mode, "===")
+
+        action_states = self._build_action_states()
+        move_hand = next((hand for action, hand, _ in gesture_engine.bindings if action == "mouse_move"), None)
+        # Last gesture result per hand id, for hysteresis.
+        previous_gestures = {}
+        no_gestures = np.zeros(len(gesture_engine.gesture_names), dtype=bool)
+
+        try:
+            while not (stop_flag and stop_flag.is_set()):
+                # Get zoomed for mediaipe; wakes up as soon as a new frame is captured
+                packet = raw_frame_mailbox.get(timeout=0.1)
+                if packet is None:
+                    if raw_frame_mailbox.closed:
+                        self.finished.set()
+                        publish(CAMERA_STATUS, running=False)
+                        break
+                    continue
+                packet.mark("queue")
+
+                frame = packet.frame
+                frame_h, frame_w = frame.shape[:2]
+
+                if power_saver and power_saver.idle:
+                    if not power_saver.detect_motion(frame):
+                        metrics.count("idle")
+                        if not self.display_thread:
+                            packet.release()
+                            continue
+                        stale_packet = display_mailbox.put(packet)
+                        if stale_packet is not None:
+                            stale_packet.release()
+                        continue
+                    # Motion: back to full tracking starting with this very frame.
+                    power_saver.wake(time.monotonic())
+                    video_thread.set_frame_rate(0)
+
+                if packet.landmarks is not None:
+                    tracker.use_landmarks(packet.landmarks, packet.handedness)
+                inference_started = time.monotonic()
+                tracker.find_hands(frame, draw=False, mark=packet.mark)
+                if governor:
+                    level = governor.observe(time.monotonic() - inference_started)
+                    if level:
+                        tracker.set_quality(**level)
+                        print(f"Tracking quality: {level}")
+                hands_present = tracker.hand_count > 0
+                if recorder:
+                    recorder.write_landmarks(packet, frame_w, frame_h, tracker.landmarks, tracker.detected_handedness)
+
+                if hands_present:
+                    if gesture_engine.refresh():
+                        previous_gestures = {}
+                    # Gesture thresholds are in pixels of the zoomed view, as before.
+                    zoomed_hands = scale_controller.transform().apply(tracker.landmarks)
+                    hand_ids = tracker.hand_ids.tolist()
+                    active = np.array([previous_gestures.get(hand_id, no_gestures) for hand_id in hand_ids])
+                    # (hands, gestures): every gesture of every hand in one pass.
+                    gesture_states = gesture_engine.evaluate_batch(zoomed_hands, frame_w, frame_h, active)
+                    previous_gestures = dict(zip(hand_ids, gesture_states))
+                    packet.mark("gestures")
+                    roles = tracker.hand_roles()
+                    if bus.wants(GESTURE):
+                        gestures_before = self._publish_gestures(gesture_states, gestures_before)
+
+                    slot = roles.get(move_hand)
+                    if slot is not None:
+                        # In the mouse's reference frame, whatever the capture resolution.
+                        center_pos = tracker.get_hand_center(mouse.frame_width, mouse.frame_height, slot)
+                        mouse.smooth_move(center_pos[0], center_pos[1], packet.timestamp)
+
+                    for state in action_states:
+                        slot = roles.get(state.hand)
+                        # Actions of a hand that is not in view keep their state.
+                        if slot is not None:
+                            state.update(bool(gesture_states[slot, state.gesture_index]), packet.timestamp)
+
+                if power_saver and power_saver.update(hands_present, time.monotonic()):
+                    video_thread.set_frame_rate(power_saver.idle_fps)
+                    print("No hand: power save")
+
+                packet.mark("inject")
+                metrics.count("processed")
+
+                now = time.monotonic()
+                if now - metrics_since >= self.metrics_interval and bus.wants(METRICS):
+                    processed = metrics.counter("processed")
+                    snapshot = metrics.snapshot()
+                    publish(METRICS, fps=(processed - processed_before) / (now - metrics_since),
+                            latency_p95=snapshot.get("stages", {}).get("total", {}).get("p95"), snapshot=snapshot)
+                    metrics_since, processed_before = now, processed
+
+                if not self.display_thread:
+                    metrics.record(packet)
+                    packet.release()
+                    continue
+                # Hand the landmarks to the preview; the display draws its own copy.
+                packet.landmarks = tracker.landmarks.copy() if hands_present else None
+                stale_packet = display_mailbox.put(packet)
+                if stale_packet is not None:
+                    stale_packet.release()
+                    metrics.count("stale")
+                    metrics.record(stale_packet)
+
+        except KeyboardInterrupt:
+            pass
+        finally:
+            cli.main_config["scale"] = scale_controller.get()
+            for state in action_states:
+                state.reset()
+            cli.persist_state()
+
+    def _build_action_states(self):
+        """One ActionState per bound action, wired to the mouse and the bus."""
+        mouse = self.mouse
+        publish = self.bus.publish
+        timing = self.cli.main_config.get("gesture_timing")
+
+        def announced(effect, action, active):
+            def run(*args):
+                effect(*args)
+                publish(ACTION, action=action, active=active)
+            return run
+
+        effects = {
+            "click": {"on_start": lambda: mouse.click('left')},
+            "double_click": {"on_start": mouse.double_click},
+            "drag": {"on_start": lambda: mouse.toggle_drag(start=True),
+                     "on_end": lambda: mouse.toggle_drag(start=False)},
+            "scroll_down": {"on_repeat": lambda count: mouse.scroll('down', amount=SCROLL_STEP * count)},
+            "scroll_up": {"on_repeat": lambda count: mouse.scroll('up', amount=SCROLL_STEP * count)},
+        }
+        states = []
+        for action, hand, gesture_index in self.gesture_engine.bindings:
+            if action not in ACTION_KINDS:
+                continue
+            callbacks = {name: announced(effect, action, name != "on_end")
+                         for name, effect in effects[action].items()}
+            states.append(ActionState(action, ACTION_KINDS[action], hand, gesture_index,
+                                      action_timing(timing, action), **callbacks))
+        return states
+
+    def _publish_gestures(self, gesture_states, before):
+        """Publishes gesture changes per tracked hand; returns the new state to compare against."""
+        tracker = self.tracker
+        names = self.gesture_engine.gesture_names
+        current = {}
+        for slot, hand_id in enumerate(tracker.hand_ids.tolist()):
+            for name, active in zip(names, gesture_states[slot].tolist()):
+                current[hand_id, name] = active
+                if before.get((hand_id, name), False) != active:
+                    self.bus.publish(GESTURE, gesture=name, active=active, hand=hand_id,
+                                     handedness=tracker.handedness[slot])
+        return current
+
+    def close(self):
+        """Releases the device, the tracker and every thread."""
+        with self._lock:
+            self._cancel_release()
+            if not self.opened:
+                return
+            self._shutdown()
+        self.bus.publish(CAMERA_STATUS, running=False)
+        print("Camera stopped")
+
+    def _shutdown(self):
+        with self._lock:
+            self.opened = False
+            self._stop.set()
+            if self._worker:
+                # The worker's finally releases a held drag through the mouse,
+                # so the mouse may only close once the worker has exited.
+                self._worker.join()
+                self._worker = None
+            self.mouse.close()
+            if self.display_thread:
+                self.display_thread.stop()
+            self.video_thread.stop()
+            self.raw_frame_mailbox.close()
+            self.display_mailbox.close()
+            # The capture thread may be inside grab()/retrieve(): release the
+            # device only after it has returned.
+            self.video_t.join(timeout=1.0)
+            self.source.release()
+            if self.recorder:
+                self.recorder.close()
+            if self.dumper:
+                self.dumper.stop()
+            self.tracker.close()
+            if self.display_thread:
+                self.display_t.join(timeout=1.0)
+            # Write what was sampled so far.
+            self.profiler.stop(wait=True)
+
+def run_camera(cli, json_manager, stop_flag=None, on_ready_callback=None, source_spec=None, record_path=None,
+               show_metrics=False, metrics_path=None, multiprocess=False, headless=False, profile_seconds=None):
+    """One session run on the calling thread (CLI mode); closes everything on return."""
+    session = CameraSession(cli, json_manager, source_spec, record_path, show_metrics, metrics_path,
+                            multiprocess, headless, profile_seconds=profile_seconds)
+    session.open()
+    try:
+        session._start_capture()
+        if on_ready_callback:
+            on_ready_callback()
+        session.run(stop_flag)
+    finally:
+        session.close()
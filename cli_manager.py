@@ -26,7 +26,7 @@ class CLIManager:
             default=None,
             help="interface language"
         )
-        self.args = self.parser.parse_args()
+        self.args, _ = self.parser.parse_known_args()
 
         self.texts = self.json_manager.load_texts()
         self.main_config = self.json_manager.load_main_config()
@@ -0,0 +1,153 @@
+import math
+
+
+class CursorFilter:
+    """Filters screen-space cursor samples stamped with ``time.monotonic()`` seconds."""
+
+    def update(self, x, y, t):
+        """Adds a measurement taken at ``t`` and returns the filtered position at ``t``."""
+        raise NotImplementedError
+
+    def predict(self, t):
+        """Extrapolated position at ``t`` (at most ``max_horizon`` past the last sample)."""
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+
+class ExponentialFilter(CursorFilter):
+    """The original per-sample moving average; frame-rate dependent, no prediction."""
+
+    def __init__(self, smoothing=7, x=0.0, y=0.0):
+        self.smoothing = smoothing
+        self.x, self.y = x, y
+
+    def update(self, x, y, t):
+        self.x += (x - self.x) / self.smoothing
+        self.y += (y - self.y) / self.smoothing
+        return self.x, self.y
+
+    def predict(self, t):
+        return self.x, self.y
+
+    def reset(self):
+        pass
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter(CursorFilter):
+    """One Euro filter (Casiez et al.): heavy smoothing at rest, little lag when moving fast."""
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, max_horizon=0.1):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.max_horizon = max_horizon
+        self.reset()
+
+    def reset(self):
+        self.t = None
+        self.x = self.y = 0.0
+        self.dx = self.dy = 0.0
+
+    def update(self, x, y, t):
+        if self.t is None:
+            self.t, self.x, self.y = t, x, y
+            return x, y
+        dt = t - self.t
+        if dt <= 0:
+            return self.x, self.y
+
+        a_d = _alpha(self.d_cutoff, dt)
+        self.dx += a_d * ((x - self.x) / dt - self.dx)
+        self.dy += a_d * ((y - self.y) / dt - self.dy)
+
+        cutoff = self.min_cutoff + self.beta * math.hypot(self.dx, self.dy)
+        a = _alpha(cutoff, dt)
+        self.x += a * (x - self.x)
+        self.y += a * (y - self.y)
+        self.t = t
+        return self.x, self.y
+
+    def predict(self, t):
+        if self.t is None:
+            return self.x, self.y
+        lead = min(max(t - self.t, 0.0), self.max_horizon)
+        return self.x + self.dx * lead, self.y + self.dy * lead
+
+
+class KalmanFilter(CursorFilter):
+    """Constant-velocity Kalman filter, one state per axis sharing a covariance.
+
+    ``process_noise`` is the acceleration noise density (px^2/s^3),
+    ``measurement_noise`` the landmark jitter variance (px^2).
+    """
+
+    def __init__(self, process_noise=5e5, measurement_noise=25.0, max_horizon=0.1):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.max_horizon = max_horizon
+        self.reset()
+
+    def reset(self):
+        self.t = None
+        self.state = [0.0, 0.0, 0.0, 0.0]  # x, vx, y, vy
+        self.p = [1e4, 0.0, 1e4]  # p00, p01, p11 (symmetric)
+
+    def update(self, x, y, t):
+        if self.t is None:
+            self.t = t
+            self.state = [x, 0.0, y, 0.0]
+            return x, y
+        dt = t - self.t
+        if dt <= 0:
+            return self.state[0], self.state[2]
+        self.t = t
+
+        # Predict
+        p00, p01, p11 = self.p
+        q = self.q
+        p00 = p00 + 2 * dt * p01 + dt * dt * p11 + q * dt ** 3 / 3.0
+        p01 = p01 + dt * p11 + q * dt ** 2 / 2.0
+        p11 = p11 + q * dt
+        px, vx, py, vy = self.state
+        px += vx * dt
+        py += vy * dt
+
+        # Update with position measurements
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        ex, ey = x - px, y - py
+        self.state = [px + k0 * ex, vx + k1 * ex, py + k0 * ey, vy + k1 * ey]
+        self.p = [(1 - k0) * p00, (1 - k0) * p01, p11 - k1 * p01]
+        return self.state[0], self.state[2]
+
+    def predict(self, t):
+        px, vx, py, vy = self.state
+        if self.t is None:
+            return px, py
+        lead = min(max(t - self.t, 0.0), self.max_horizon)
+        return px + vx * lead, py + vy * lead
+
+
+FILTERS = {
+    "exponential": ExponentialFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def create_filter(settings=None, smoothing=7):
+    """Builds a filter from a ``cursor_filter`` config dict like ``{"type": "one_euro", "beta": 0.01}``."""
+    settings = dict(settings or {})
+    kind = settings.pop("type", "exponential")
+    for key in ("prediction", "prediction_lead", "output_rate"):
+        settings.pop(key, None)
+    if kind == "exponential":
+        settings.setdefault("smoothing", smoothing)
+    return FILTERS[kind](**settings)
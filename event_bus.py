@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import deque
+
+# Event kinds and their data
+TOGGLE_CAMERA = "toggle_camera"        # UI start/stop button: {}
+CAMERA_STARTING = "camera_starting"    # camera is being opened: {}
+CAMERA_STATUS = "camera_status"        # {"running": bool}
+GESTURE = "gesture"                    # {"gesture", "active", "hand": id, "handedness"}, on changes
+ACTION = "action"                      # {"action": profile action, "active": bool}
+METRICS = "metrics"                    # {"fps": float, "latency_p95": ms or None, "snapshot": dict}
+UI_CLOSED = "ui_closed"                # the window was closed: {}
+
+EVENT_KINDS = frozenset((TOGGLE_CAMERA, CAMERA_STARTING, CAMERA_STATUS, GESTURE, ACTION, METRICS, UI_CLOSED))
+
+
+class Event:
+    __slots__ = ("kind", "data", "timestamp")
+
+    def __init__(self, kind, data, timestamp):
+        self.kind = kind
+        self.data = data
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"Event({self.kind!r}, {self.data!r})"
+
+
+class EventQueue:
+    """FIFO of events for one consumer thread; ``get`` blocks until something arrives.
+
+    Bounded: when the consumer falls behind, the oldest events are dropped.
+    """
+
+    def __init__(self, maxlen=256):
+        self._condition = threading.Condition()
+        self._events = deque(maxlen=maxlen)
+        self.closed = False
+
+    def put(self, event):
+        with self._condition:
+            self._events.append(event)
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """Next event, or None on timeout or once closed and empty."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._events or self.closed, timeout):
+                return None
+            return self._events.popleft() if self._events else None
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class EventBus:
+    """Typed publish/subscribe between the main loop, UIManager and the camera session."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # kind -> tuple of callbacks, replaced on change so publish never locks.
+        self._subscribers = {}
+
+    def subscribe(self, kinds, callback):
+        kinds = (kinds,) if isinstance(kinds, str) else tuple(kinds)
+        unknown = set(kinds) - EVENT_KINDS
+        if unknown:
+            raise ValueError(f"Unknown event kinds: {sorted(unknown)}")
+        with self._lock:
+            for kind in kinds:
+                self._subscribers[kind] = self._subscribers.get(kind, ()) + (callback,)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            for kind, callbacks in list(self._subscribers.items()):
+                remaining = tuple(cb for cb in callbacks if cb != callback)
+                if remaining:
+                    self._subscribers[kind] = remaining
+                else:
+                    del self._subscribers[kind]
+
+    def queue(self, kinds, maxlen=256):
+        events = EventQueue(maxlen)
+        self.subscribe(kinds, events.put)
+        return events
+
+    def wants(self, kind):
+        return kind in self._subscribers
+
+    def publish(self, kind, **data):
+        callbacks = self._subscribers.get(kind)
+        if not callbacks:
+            return
+        event = Event(kind, data, time.monotonic())
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Event handler error ({kind}): {e}")
@@ -0,0 +1,44 @@
+import threading
+
+
+class FrameMailbox:
+    """Single-slot, latest-value hand-off between pipeline threads."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self.closed = False
+
+    def put(self, item, block=False, timeout=None):
+        """Stores ``item``; returns the unread item it replaced, or None.
+
+        With ``block=True`` it waits for the consumer instead and returns ``item`` if that times out.
+        """
+        with self._condition:
+            if block and self._has_item:
+                self._condition.wait_for(lambda: not self._has_item or self.closed, timeout)
+                if self._has_item and not self.closed:
+                    return item
+            replaced = self._item if self._has_item else None
+            self._item = item
+            self._has_item = True
+            self._condition.notify_all()
+            return replaced
+
+    def get(self, timeout=None):
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._has_item or self.closed, timeout):
+                return None
+            if not self._has_item:
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            self._condition.notify_all()
+            return item
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
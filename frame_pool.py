@@ -0,0 +1,34 @@
+import threading
+
+import numpy as np
+
+
+class FramePool:
+    """Preallocated frames owned by one FramePacket at a time; ``acquire`` returns None when all are busy."""
+
+    def __init__(self, count=6, metrics=None):
+        self.count = count
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._shape = None
+        self._free = []
+        self._owned = []
+
+    def acquire(self, shape):
+        with self._lock:
+            if shape != self._shape:
+                self._shape = shape
+                self._free = [np.empty(shape, dtype=np.uint8) for _ in range(self.count)]
+                self._owned = list(self._free)
+            if self._free:
+                return self._free.pop()
+        if self.metrics:
+            self.metrics.count("pool_miss")
+        return None
+
+    def release(self, frame):
+        with self._lock:
+            # Frames from an older shape (or allocated on a miss) are simply dropped. Checked
+            # by identity, since a freed frame's id() can be reused by an unrelated array.
+            if any(owned is frame for owned in self._owned) and not any(free is frame for free in self._free):
+                self._free.append(frame)
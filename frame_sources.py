@@ -0,0 +1,360 @@
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+RECORDED_VIDEO = "frames.avi"
+RECORDED_FRAMES = "frames.jsonl"
+RECORDED_LANDMARKS = "landmarks.jsonl"
+
+CAPTURE_BACKENDS = {
+    "any": cv2.CAP_ANY,
+    "v4l2": cv2.CAP_V4L2,
+    "dshow": cv2.CAP_DSHOW,
+    "msmf": cv2.CAP_MSMF,
+    "avfoundation": cv2.CAP_AVFOUNDATION,
+}
+
+
+class FramePacket:
+    """A captured frame plus what the pipeline needs to know about it."""
+    __slots__ = ("frame", "timestamp", "index", "landmarks", "handedness", "stamps", "pool")
+
+    def __init__(self, frame, timestamp, index, landmarks=None, handedness=None, pool=None):
+        self.frame = frame
+        self.timestamp = timestamp
+        self.index = index
+        # Normalized (hands, 21, 3) landmarks when the source already knows them,
+        # with MediaPipe's "Left"/"Right" label per hand if it was recorded.
+        self.landmarks = landmarks
+        self.handedness = handedness
+        # (stage, time.monotonic()) in pipeline order, starting at capture.
+        self.stamps = [("capture", timestamp)]
+        # FramePool that owns ``frame``; see release().
+        self.pool = pool
+
+    def mark(self, stage):
+        self.stamps.append((stage, time.monotonic()))
+
+    def release(self):
+        """Gives a pooled frame back; the packet's frame must not be used afterwards."""
+        if self.pool is not None:
+            self.pool.release(self.frame)
+            self.pool = None
+
+
+class FrameSource:
+    # Live sources drop frames under load; replayed sources block so runs stay deterministic.
+    live = False
+    # Frames that are already mirrored (and landmarks in that space).
+    preprocessed = False
+    # FramePool to decode into, set with use_pool(); None allocates per frame.
+    pool = None
+
+    def use_pool(self, pool):
+        self.pool = pool
+
+    def _acquire(self, shape):
+        return self.pool.acquire(shape) if self.pool is not None and shape is not None else None
+
+    def _packet(self, frame, buffer, timestamp, index, landmarks=None, handedness=None):
+        """Wraps a frame read into ``buffer``; the pool owns it only if it was actually used."""
+        if buffer is not None and frame is not buffer:
+            # Shape changed (or the backend ignored the buffer).
+            self.pool.release(buffer)
+            buffer = None
+        return FramePacket(frame, timestamp, index, landmarks, handedness,
+                           self.pool if buffer is not None else None)
+
+    def read(self):
+        """Returns the next FramePacket, or None when the source is exhausted."""
+        raise NotImplementedError
+
+    def take_dropped(self):
+        """Frames the source skipped internally since the last call."""
+        return 0
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """Live camera tuned for latency: small driver queue, stale frames dropped before decoding."""
+    live = True
+
+    def __init__(self, camera_id=0, width=640, height=480, fps=30, fourcc="MJPG", backend="auto",
+                 buffer_size=1, max_age=1.5, max_drain=4, max_retries=30):
+        self.cap = self._open(camera_id, backend)
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or fps or 30
+        self.max_age = max_age / self.fps
+        self.max_drain = max_drain
+        # Consecutive failed grabs or decodes before the camera counts as lost.
+        self.max_retries = max_retries
+        # Only V4L2 reports buffer timestamps on time.monotonic()'s clock.
+        self.driver_timestamps = self.cap.isOpened() and self.cap.getBackendName() == "V4L2"
+        self.index = 0
+        self._dropped = 0
+        self._shape = None
+        self._describe(camera_id)
+
+    @staticmethod
+    def _open(camera_id, backend):
+        if backend == "auto":
+            backend = "v4l2" if sys.platform.startswith("linux") else "any"
+        api = CAPTURE_BACKENDS.get(backend, cv2.CAP_ANY)
+        cap = cv2.VideoCapture(camera_id, api)
+        if not cap.isOpened() and api != cv2.CAP_ANY:
+            print(f"Camera backend {backend} failed, using the default backend")
+            cap = cv2.VideoCapture(camera_id)
+        return cap
+
+    def _describe(self, camera_id):
+        if not self.cap.isOpened():
+            print(f"Camera {camera_id} could not be opened")
+            return
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00") or "?"
+        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        print(f"Camera {camera_id}: {width}x{height} {fourcc} @ {self.fps:g} fps ({self.cap.getBackendName()})")
+
+    def _capture_time(self, grabbed_at):
+        if self.driver_timestamps:
+            stamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            # Reject 0 (first frame) and stamps on another clock.
+            if 0.0 <= grabbed_at - stamp < 1.0:
+                return stamp
+        return grabbed_at
+
+    def _grab(self):
+        """Grabs the newest frame without decoding it; returns its capture time, or None if grab() failed."""
+        drained = 0
+        while self.cap.grab():
+            grabbed_at = time.monotonic()
+            captured = self._capture_time(grabbed_at)
+            if grabbed_at - captured <= self.max_age or drained >= self.max_drain:
+                return captured
+            # Queued while we were busy: skip it without decoding.
+            drained += 1
+            self._dropped += 1
+        return None
+
+    def read(self):
+        # Failed grabs and failed decodes share one budget, so a device that
+        # stays open but delivers nothing ends the stream instead of spinning.
+        for _ in range(self.max_retries):
+            captured = self._grab()
+            if captured is None:
+                if not self.cap.isOpened():
+                    return None
+                time.sleep(0.01)
+                continue
+            buffer = self._acquire(self._shape)
+            ret, frame = self.cap.retrieve(buffer)
+            if ret:
+                break
+            # A corrupt MJPEG frame or a dropped driver buffer: skip it, the stream goes on.
+            if buffer is not None:
+                self.pool.release(buffer)
+            self._dropped += 1
+        else:
+            print(f"Camera: no frame in {self.max_retries} tries, stopping")
+            return None
+        self._shape = frame.shape
+        packet = self._packet(frame, buffer, captured, self.index)
+        self.index += 1
+        return packet
+
+    def take_dropped(self):
+        dropped, self._dropped = self._dropped, 0
+        return dropped
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Cannot open video: {path}")
+        self.index = 0
+        self._shape = None
+
+    def read(self):
+        buffer = self._acquire(self._shape)
+        ret, frame = self.cap.read(buffer)
+        if not ret and self.loop and self.index:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(buffer)
+        if not ret:
+            if buffer is not None:
+                self.pool.release(buffer)
+            return None
+        self._shape = frame.shape
+        packet = self._packet(frame, buffer, time.monotonic(), self.index)
+        self.index += 1
+        return packet
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    def __init__(self, path, loop=False):
+        self.paths = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.paths:
+            raise ValueError(f"No images in: {path}")
+        self.loop = loop
+        self.index = 0
+
+    def read(self):
+        while self.paths:
+            if self.index >= len(self.paths) and not self.loop:
+                return None
+            position = self.index % len(self.paths)
+            frame = cv2.imread(self.paths[position])
+            if frame is not None:
+                packet = FramePacket(frame, time.monotonic(), self.index)
+                self.index += 1
+                return packet
+            # Not an image after all (or truncated): drop it so a loop does not retry it.
+            print(f"Skipping unreadable image: {self.paths.pop(position)}")
+        return None
+
+
+class LandmarkStreamSource(FrameSource):
+    """Replays landmarks recorded by SessionRecorder without running MediaPipe."""
+    preprocessed = True
+
+    def __init__(self, path, loop=False):
+        with open(os.path.join(path, RECORDED_LANDMARKS), encoding="utf-8") as file:
+            self.records = [json.loads(line) for line in file if line.strip()]
+        if not self.records:
+            raise ValueError(f"No landmarks recorded in: {path}")
+        self.loop = loop
+        self.index = 0
+        self._canvases = {}
+        # Recorded capture times relative to the first record; a loop continues
+        # one frame interval after the last one.
+        times = [record.get("t", i / 30.0) for i, record in enumerate(self.records)]
+        self._offsets = [t - times[0] for t in times]
+        interval = self._offsets[-1] / (len(times) - 1) if self._offsets[-1] > 0 else 1 / 30.0
+        self._loop_span = self._offsets[-1] + interval
+        self._started = None
+
+    def _replay_time(self):
+        """Capture time of the current record, on time.monotonic()'s clock from the start of the replay."""
+        if self._started is None:
+            self._started = time.monotonic()
+        loops, position = divmod(self.index, len(self.records))
+        return self._started + loops * self._loop_span + self._offsets[position]
+
+    def read(self):
+        if self.index >= len(self.records) and not self.loop:
+            return None
+        record = self.records[self.index % len(self.records)]
+        size = (record["height"], record["width"], 3)
+        if size not in self._canvases:
+            self._canvases[size] = np.zeros(size, dtype=np.uint8)
+        landmarks = np.array(record["hands"], dtype=np.float32).reshape(-1, 21, 3)
+        buffer = self._acquire(size)
+        if buffer is None:
+            frame = self._canvases[size].copy()
+        else:
+            frame = buffer
+            np.copyto(frame, self._canvases[size])
+        packet = self._packet(frame, buffer, time.monotonic(), self.index, landmarks, record.get("handedness"))
+        # Gesture timing and cursor filters follow the recorded times, so a replay
+        # at any speed behaves like the session did; latency stamps stay real.
+        packet.timestamp = self._replay_time()
+        self.index += 1
+        return packet
+
+
+class SessionRecorder:
+    """Writes raw frames, capture timestamps and tracked landmarks of a session."""
+
+    def __init__(self, path, fps=30.0):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.fps = fps
+        self.writer = None
+        self.frames_file = open(os.path.join(path, RECORDED_FRAMES), "w", encoding="utf-8")
+        self.landmarks_file = open(os.path.join(path, RECORDED_LANDMARKS), "w", encoding="utf-8")
+
+    def write_frame(self, packet):
+        if self.writer is None:
+            h, w = packet.frame.shape[:2]
+            fourcc = cv2.VideoWriter_fourcc(*"MJPG")
+            self.writer = cv2.VideoWriter(os.path.join(self.path, RECORDED_VIDEO), fourcc, self.fps, (w, h))
+        self.writer.write(packet.frame)
+        self.frames_file.write(json.dumps({"index": packet.index, "t": packet.timestamp}) + "\n")
+
+    def write_landmarks(self, packet, frame_width, frame_height, landmarks, handedness=None):
+        record = {
+            "index": packet.index,
+            "t": packet.timestamp,
+            "width": frame_width,
+            "height": frame_height,
+            "hands": np.round(landmarks, 5).tolist(),
+        }
+        if handedness:
+            record["handedness"] = list(handedness)
+        self.landmarks_file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+        self.frames_file.close()
+        self.landmarks_file.close()
+
+
+def open_source(spec=None, camera_id=0, loop=False, capture=None):
+    """Builds a source from ``camera[:id or /dev path]``, ``video:``, ``images:``, ``landmarks:`` or a bare path.
+
+    ``capture`` holds CameraSource options (main_config "capture").
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+    capture = capture or {}
+    if not spec or spec == "camera":
+        return CameraSource(camera_id, **capture)
+    kind, _, target = spec.partition(":")
+    if kind == "camera":
+        if not target:
+            return CameraSource(camera_id, **capture)
+        return CameraSource(int(target) if target.isdigit() else target, **capture)
+    if kind == "video":
+        return VideoFileSource(target, loop)
+    if kind == "images":
+        return ImageDirSource(target, loop)
+    if kind == "landmarks":
+        return LandmarkStreamSource(target, loop)
+
+    if spec.isdigit():
+        return CameraSource(int(spec), **capture)
+    if os.path.isdir(spec):
+        if os.path.exists(os.path.join(spec, RECORDED_VIDEO)):
+            return VideoFileSource(os.path.join(spec, RECORDED_VIDEO), loop)
+        if os.path.exists(os.path.join(spec, RECORDED_LANDMARKS)):
+            return LandmarkStreamSource(spec, loop)
+        return ImageDirSource(spec, loop)
+    return VideoFileSource(spec, loop)
@@ -0,0 +1,193 @@
+"""k-nearest-neighbour gesture classifier over normalized landmark features.
+
+    python gesture_classifier.py record peace --source camera --frames 300
+    python gesture_classifier.py record none --source recordings/relaxed_hand
+    python gesture_classifier.py train
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+MODEL_FILE = "gesture_model.json"
+SAMPLES_DIR = os.path.join("res", "gesture_samples")
+WRIST = 0
+MIDDLE_MCP = 9
+TIP_IDS = (4, 8, 12, 16, 20)
+TIP_PAIRS = np.array([(a, b) for i, a in enumerate(TIP_IDS) for b in TIP_IDS[i + 1:]], dtype=np.intp)
+
+
+def landmark_features(hands, frame_width, frame_height):
+    """(hands, 50) wrist-relative, hand-size-normalized features for (hands, 21, >=2) points."""
+    points = np.asarray(hands, dtype=np.float32)[:, :, :2] * np.array([frame_width, frame_height], dtype=np.float32)
+    points = points - points[:, WRIST:WRIST + 1]
+    size = np.sqrt((points[:, MIDDLE_MCP] ** 2).sum(axis=-1))
+    points /= np.maximum(size, 1e-6)[:, None, None]
+    deltas = points[:, TIP_PAIRS[:, 0]] - points[:, TIP_PAIRS[:, 1]]
+    distances = np.sqrt((deltas * deltas).sum(axis=-1))
+    return np.concatenate((points[:, 1:].reshape(len(points), -1), distances), axis=1)
+
+
+class GestureClassifier:
+    """k-NN over standardized landmark features; ``votes`` scores all hands with one matrix product."""
+
+    def __init__(self, labels, samples, sample_labels, mean, scale, k=5):
+        self.labels = list(labels)
+        self.k = min(k, len(samples))
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.sample_labels = np.asarray(sample_labels, dtype=np.intp)
+        self._samples_t = np.ascontiguousarray(self.samples.T)
+        self._sample_norms = (self.samples * self.samples).sum(axis=1)
+        self._one_hot = np.eye(len(self.labels), dtype=np.float32)[self.sample_labels]
+
+    @classmethod
+    def fit(cls, features, labels, k=5):
+        """Stores the standardized ``features``; ``labels`` are strings aligned with them."""
+        names = sorted(set(labels))
+        features = np.asarray(features, dtype=np.float32)
+        mean = features.mean(axis=0)
+        scale = np.maximum(features.std(axis=0), 1e-3)
+        indices = [names.index(label) for label in labels]
+        return cls(names, (features - mean) / scale, indices, mean, scale, k)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["labels"], data["samples"], data["sample_labels"], data["mean"], data["scale"], data["k"])
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "labels": self.labels,
+            "mean": np.round(self.mean.astype(np.float64), 5).tolist(),
+            "scale": np.round(self.scale.astype(np.float64), 5).tolist(),
+            "samples": np.round(self.samples.astype(np.float64), 4).tolist(),
+            "sample_labels": self.sample_labels.tolist(),
+        }
+
+    def votes(self, features):
+        """(hands, labels) share of the k nearest samples per label."""
+        x = (features - self.mean) / self.scale
+        # |x|^2 is the same for every sample of a hand, so it does not change the order.
+        distances = self._sample_norms - 2.0 * (x @ self._samples_t)
+        nearest = np.argpartition(distances, self.k - 1, axis=1)[:, :self.k]
+        return self._one_hot[nearest].mean(axis=1)
+
+    def leave_one_out_accuracy(self):
+        """Share of stored samples whose k nearest other samples vote for their own label."""
+        distances = self._sample_norms[:, None] + self._sample_norms[None, :] - 2.0 * (self.samples @ self._samples_t)
+        np.fill_diagonal(distances, np.inf)
+        k = min(self.k, len(self.samples) - 1)
+        if k < 1:
+            return None
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        predicted = self._one_hot[nearest].sum(axis=1).argmax(axis=1)
+        return float((predicted == self.sample_labels).mean())
+
+
+def load_samples(samples_dir):
+    """(features, labels) of every ``<label>.jsonl`` in ``samples_dir``."""
+    features, labels = [], []
+    for filename in sorted(os.listdir(samples_dir)):
+        if not filename.endswith(".jsonl"):
+            continue
+        with open(os.path.join(samples_dir, filename), encoding="utf-8") as file:
+            records = [json.loads(line) for line in file if line.strip()]
+        for record in records:
+            points = np.array(record["points"], dtype=np.float32).reshape(1, 21, -1)
+            features.append(landmark_features(points, record["width"], record["height"])[0])
+            labels.append(record["label"])
+    return features, labels
+
+
+def record_samples(label, source_spec=None, frames=300, delay=3.0, samples_dir=SAMPLES_DIR):
+    """Appends every hand seen in ``frames`` frames of the source to ``<label>.jsonl``."""
+    from frame_sources import RECORDED_LANDMARKS, LandmarkStreamSource, open_source
+    from json_manager import JsonManager
+
+    config = JsonManager().load_main_config()
+    if source_spec and os.path.isdir(source_spec) and os.path.exists(os.path.join(source_spec, RECORDED_LANDMARKS)):
+        # A recorded session: reuse its landmarks instead of running MediaPipe on the video.
+        source = LandmarkStreamSource(source_spec)
+    else:
+        source = open_source(source_spec, config.get("camera_id", 0), capture=config.get("capture"))
+    tracker = None
+    if not source.preprocessed:
+        from hand_tracker import HandTracker
+        tracker = HandTracker(max_hands=config.get("max_hands", 1), mirror=True)
+    if source.live and delay:
+        print(f"Show '{label}' to the camera, recording in {delay:.0f} s")
+        time.sleep(delay)
+
+    os.makedirs(samples_dir, exist_ok=True)
+    recorded = 0
+    try:
+        with open(os.path.join(samples_dir, f"{label}.jsonl"), "a", encoding="utf-8") as file:
+            for _ in range(frames):
+                packet = source.read()
+                if packet is None:
+                    break
+                height, width = packet.frame.shape[:2]
+                if tracker:
+                    tracker.find_hands(packet.frame, draw=False)
+                    hands = tracker.landmarks
+                else:
+                    hands = packet.landmarks if packet.landmarks is not None else ()
+                for points in hands:
+                    record = {"label": label, "width": width, "height": height,
+                              "points": np.round(points, 5).tolist()}
+                    file.write(json.dumps(record) + "\n")
+                    recorded += 1
+                packet.release()
+    finally:
+        source.release()
+        if tracker:
+            tracker.close()
+    print(f"Recorded {recorded} samples of '{label}'")
+
+
+def train(samples_dir=SAMPLES_DIR, model_file=MODEL_FILE, k=5):
+    from json_manager import JsonManager
+
+    features, labels = load_samples(samples_dir)
+    if not features:
+        print(f"No samples in {samples_dir}")
+        return
+    classifier = GestureClassifier.fit(features, labels, k)
+    for name in classifier.labels:
+        print(f"{name:<24} {labels.count(name):>6} samples")
+    accuracy = classifier.leave_one_out_accuracy()
+    if accuracy is not None:
+        print(f"Leave-one-out accuracy: {accuracy:.1%}")
+    json_manager = JsonManager()
+    json_manager.save_json(model_file, classifier.to_dict())
+    json_manager.flush()
+    print(f"Saved {os.path.join(json_manager.base_dir, model_file)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record gesture samples and train the gesture classifier")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="record samples of one label")
+    record.add_argument("label")
+    record.add_argument("--source", default=None, help="camera[:id], video:PATH or a recording dir")
+    record.add_argument("--frames", type=int, default=300, help="frames to read from the source")
+    record.add_argument("--delay", type=float, default=3.0, help="seconds before a camera starts recording")
+    record.add_argument("--samples", default=SAMPLES_DIR, help="directory of <label>.jsonl sample files")
+    fit = commands.add_parser("train", help=f"train res/{MODEL_FILE} from the recorded samples")
+    fit.add_argument("--samples", default=SAMPLES_DIR, help="directory of <label>.jsonl sample files")
+    fit.add_argument("--model", default=MODEL_FILE, help="model file name under res/")
+    fit.add_argument("--k", type=int, default=5, help="neighbours that vote on a hand")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record_samples(args.label, args.source, args.frames, args.delay, args.samples)
+    else:
+        train(args.samples, args.model, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,358 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 
+# MediaPipe takes seconds to import; it is loaded on first HandTracker use.
+mp = None
+
+def load_mediapipe():
+    global mp
+    if mp is None:
+        import mediapipe
+        mp = mediapipe
+    return mp
+
+LANDMARK_COUNT = 21
+FINGER_TIPS = {
+    'thumb': 4,
+    'index': 8,
+    'middle': 12,
+    'ring': 16,
+    'pinky': 20
+}
+
+# Same topology as mp.solutions.hands.HAND_CONNECTIONS, without needing MediaPipe to draw.
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+def draw_landmarks(image, landmarks, center=False):
+    """Draws normalized (hands, 21, >=2) landmarks onto an image of any size."""
+    h, w = image.shape[:2]
+    radius = max(2, w // 200)
+    for points in landmarks:
+        pixels = (points[:, :2] * (w, h)).astype(np.int32)
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(image, tuple(pixels[a].tolist()), tuple(pixels[b].tolist()), (255, 255, 255), 2)
+        for x, y in pixels.tolist():
+            cv2.circle(image, (x, y), radius, (0, 0, 255), cv2.FILLED)
+        if center:
+            center_x, center_y = pixels.mean(axis=0).astype(int).tolist()
+            cv2.circle(image, (center_x, center_y), radius * 4, (0, 255, 255), cv2.FILLED)
+
+
+class HandAssociator:
+    """Gives detected hands ids that stay stable from frame to frame."""
+
+    def __init__(self, max_distance=0.3, handedness_penalty=0.2, max_missing=10, max_votes=5):
+        self.max_distance = max_distance
+        self.handedness_penalty = handedness_penalty
+        self.max_missing = max_missing
+        self.max_votes = max_votes
+        self.reset()
+
+    def reset(self):
+        self._next_id = 0
+        # [id, center (2,), votes (>0 right, <0 left), frames missing]
+        self._tracks = []
+
+    def update(self, landmarks, labels=None):
+        """Returns ``(ids, handedness)`` aligned with the (hands, 21, >=2) ``landmarks``."""
+        count = len(landmarks)
+        centers = landmarks[:, :, :2].mean(axis=1) if count else np.empty((0, 2), dtype=np.float32)
+        votes = [1 if label == "Right" else -1 if label == "Left" else 0 for label in (labels or [None] * count)]
+
+        assigned = [None] * count
+        if count and self._tracks:
+            track_centers = np.array([track[1] for track in self._tracks], dtype=np.float32)
+            cost = np.linalg.norm(centers[:, None, :] - track_centers[None, :, :], axis=-1)
+            track_signs = np.sign([track[2] for track in self._tracks])
+            cost += ((np.array(votes)[:, None] * track_signs[None, :]) < 0) * self.handedness_penalty
+            taken = set()
+            for flat in np.argsort(cost, axis=None).tolist():
+                hand, track = divmod(flat, cost.shape[1])
+                if cost[hand, track] > self.max_distance:
+                    break
+                if assigned[hand] is None and track not in taken:
+                    assigned[hand] = track
+                    taken.add(track)
+
+        for track in self._tracks:
+            track[3] += 1
+        ids = np.empty(count, dtype=np.int64)
+        handedness = []
+        for hand in range(count):
+            if assigned[hand] is None:
+                track = [self._next_id, centers[hand], 0, 0]
+                self._next_id += 1
+                self._tracks.append(track)
+            else:
+                track = self._tracks[assigned[hand]]
+            track[1] = centers[hand]
+            track[2] = max(-self.max_votes, min(self.max_votes, track[2] + votes[hand]))
+            track[3] = 0
+            ids[hand] = track[0]
+            handedness.append("Right" if track[2] > 0 else "Left" if track[2] < 0 else None)
+        self._tracks = [track for track in self._tracks if track[3] <= self.max_missing]
+        return ids, handedness
+
+
+def hand_roles(hand_ids, handedness):
+    """Hand slot for each binding role: "any" (the longest-tracked hand), "left" and "right"."""
+    roles = {}
+    for slot in np.argsort(hand_ids, kind="stable").tolist():
+        roles.setdefault("any", slot)
+        if handedness[slot]:
+            roles.setdefault(handedness[slot].lower(), slot)
+    return roles
+
+
 class HandTracker:
-    def __init__(self, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7):
+    def __init__(self, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7,
+                 roi_tracking=False, roi_padding=0.5, roi_min_size=160, model_complexity=1, input_scale=1.0,
+                 roi_redetect_interval=15, mirror=False):
         self.max_hands = max_hands
+        self.detection_confidence = detection_confidence
+        self.tracking_confidence = tracking_confidence
+        self.model_complexity = model_complexity
+        # Frames (or ROI crops) are downscaled by this factor before inference;
+        # landmarks are normalized, so nothing needs mapping back.
+        self.input_scale = input_scale
+        # Region of interest derived from the previous frame's landmarks, as
+        # pixel (x0, y0, x1, y1); None means a full-frame search.
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.roi_min_size = roi_min_size
+        # With fewer hands than max_hands tracked, every Nth frame searches the
+        # full frame so a hand entering outside the crop is still found.
+        self.roi_redetect_interval = roi_redetect_interval
+        self._frames_since_full_search = 0
+        self.roi = None
+        # Frames arrive unmirrored; landmarks (and handedness) are reported as
+        # if they had been flipped horizontally, so the frame itself never is.
+        self.mirror = mirror
+        # Grow-only flat buffers for the resized / RGB input, see _scratch().
+        self._scratch_buffers = {}
+        load_mediapipe()
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=max_hands,
-            min_detection_confidence=detection_confidence,
-            min_tracking_confidence=tracking_confidence
-        )
+        self.hands = self._create_hands()
         self.mp_draw = mp.solutions.drawing_utils
         self.results = None
+        # Normalized (x, y, z) per landmark, filled once per processed frame.
+        self._landmark_buffer = np.zeros((max_hands, LANDMARK_COUNT, 3), dtype=np.float32)
+        self.landmarks = self._landmark_buffer[:0]
+        self._reset_identities()
+
+    def _reset_identities(self):
+        self.associator = HandAssociator()
+        # Per-frame MediaPipe labels, then the stable per-track ids and labels.
+        self.detected_handedness = []
+        self.hand_ids = np.empty(0, dtype=np.int64)
+        self.handedness = []
+
+    def _identify(self, labels):
+        self.detected_handedness = labels
+        self.hand_ids, self.handedness = self.associator.update(self.landmarks, labels)
+
+    def _create_hands(self):
+        return self.mp_hands.Hands(
+            max_num_hands=self.max_hands,
+            model_complexity=self.model_complexity,
+            min_detection_confidence=self.detection_confidence,
+            min_tracking_confidence=self.tracking_confidence
+        )
+
+    def set_quality(self, input_scale=1.0, model_complexity=1):
+        self.input_scale = input_scale
+        if model_complexity != self.model_complexity:
+            # MediaPipe fixes the model when the graph is built.
+            self.model_complexity = model_complexity
+            self.hands.close()
+            self.hands = self._create_hands()
+
+    def _scratch(self, name, height, width):
+        """Contiguous (height, width, 3) view into a reusable buffer; ROI crops change size every frame."""
+        size = height * width * 3
+        flat = self._scratch_buffers.get(name)
+        if flat is None or flat.size < size:
+            flat = self._scratch_buffers[name] = np.empty(size, dtype=np.uint8)
+        return flat[:size].reshape(height, width, 3)
 
-    def find_hands(self, frame, draw=True):
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def _prepare(self, image):
+        # Downscale first so the colour conversion touches fewer pixels.
+        if self.input_scale < 1.0:
+            h, w = image.shape[:2]
+            size = (max(1, round(w * self.input_scale)), max(1, round(h * self.input_scale)))
+            image = cv2.resize(image, size, dst=self._scratch("scaled", size[1], size[0]),
+                               interpolation=cv2.INTER_AREA)
+        h, w = image.shape[:2]
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._scratch("rgb", h, w))
+
+    def find_hands(self, frame, draw=True, mark=None):
+        target = frame
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            target = frame[y0:y1, x0:x1]
+        frame_rgb = self._prepare(target)
+        if mark:
+            mark("cvt_color")
         self.results = self.hands.process(frame_rgb)
+        if not self.results.multi_hand_landmarks and self.roi is not None:
+            # Hand left the crop: fall back to a full-frame search on this frame.
+            self.roi = None
+            target = frame
+            self.results = self.hands.process(self._prepare(frame))
+        self._update_landmarks()
+        self._map_from_roi(frame)
+        # The crop is in frame pixels, so it is found before mirroring.
+        self._update_roi(frame)
+        if self.mirror and self.hand_count:
+            self.landmarks[:, :, 0] = 1.0 - self.landmarks[:, :, 0]
+        self._identify(self._detected_labels())
+        if mark:
+            mark("inference")
         if self.results.multi_hand_landmarks and draw:
+            # The crop is a view of the frame, so drawing on it lands in the right place.
             for hand_landmarks in self.results.multi_hand_landmarks:
                 self.mp_draw.draw_landmarks(
-                    frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
+                    target, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
                 )
+            if mark:
+                mark("draw")
         return frame
 
-    def get_hand_landmarks(self, hand_index=0):
-        if self.results and self.results.multi_hand_landmarks:
-            if hand_index < len(self.results.multi_hand_landmarks):
-                raw_landmarks = self.results.multi_hand_landmarks[hand_index]
-                return [
-                    (i, lm.x, lm.y, lm.z)
-                    for i, lm in enumerate(raw_landmarks.landmark)
-                ]
+    def _map_from_roi(self, frame):
+        if self.roi is None or not self.hand_count:
+            return
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = self.roi
+        scale_x, scale_y = (x1 - x0) / w, (y1 - y0) / h
+        self.landmarks[:, :, 0] = self.landmarks[:, :, 0] * scale_x + x0 / w
+        self.landmarks[:, :, 1] = self.landmarks[:, :, 1] * scale_y + y0 / h
+        self.landmarks[:, :, 2] *= scale_x
+
+    def _update_roi(self, frame):
+        if not self.roi_tracking or not self.hand_count:
+            self.roi = None
+            return
+        h, w = frame.shape[:2]
+        points = self.landmarks[:, :, :2].reshape(-1, 2) * (w, h)
+        (min_x, min_y), (max_x, max_y) = points.min(axis=0), points.max(axis=0)
+        full_search_due = (self.hand_count < self.max_hands
+                           and self._frames_since_full_search >= self.roi_redetect_interval)
+        if self.roi is not None and not full_search_due:
+            # Keep the crop while the hand stays well inside it: MediaPipe's video
+            # mode tracks the hand in the previous input's coordinates, so every
+            # change of crop geometry would hand it a wrong prior.
+            x0, y0, x1, y1 = self.roi
+            margin = min(x1 - x0, y1 - y0) * self.roi_padding / (2.0 * (1.0 + 2.0 * self.roi_padding))
+            if x0 + margin <= min_x and max_x <= x1 - margin and y0 + margin <= min_y and max_y <= y1 - margin:
+                self._frames_since_full_search += 1
+                return
+        size = max(max_x - min_x, max_y - min_y) * (1.0 + 2.0 * self.roi_padding)
+        size = max(size, self.roi_min_size)
+        center_x, center_y = (min_x + max_x) / 2.0, (min_y + max_y) / 2.0
+        x0 = int(max(0, center_x - size / 2.0))
+        y0 = int(max(0, center_y - size / 2.0))
+        x1 = int(min(w, center_x + size / 2.0))
+        y1 = int(min(h, center_y + size / 2.0))
+        if (x1 - x0) * (y1 - y0) >= 0.8 * w * h:
+            self.roi = None
+        elif full_search_due:
+            self.roi = None
+            self._frames_since_full_search = 0
+        else:
+            self.roi = (x0, y0, x1, y1)
+            self._frames_since_full_search += 1
+
+    def _update_landmarks(self):
+        hands = self.results.multi_hand_landmarks if self.results else None
+        count = min(len(hands), self.max_hands) if hands else 0
+        for hand_index in range(count):
+            target = self._landmark_buffer[hand_index]
+            for i, lm in enumerate(hands[hand_index].landmark):
+                target[i, 0] = lm.x
+                target[i, 1] = lm.y
+                target[i, 2] = lm.z
+        self.landmarks = self._landmark_buffer[:count]
+
+    def _detected_labels(self):
+        classified = self.results.multi_handedness if self.results else None
+        if not classified:
+            return None
+        labels = [hand.classification[0].label for hand in classified[:self.hand_count]]
+        if self.mirror:
+            # MediaPipe labels assume a selfie (mirrored) image.
+            labels = [{"Left": "Right", "Right": "Left"}.get(label, label) for label in labels]
+        return labels
+
+    @property
+    def hand_count(self):
+        return self.landmarks.shape[0]
+
+    def get_landmark_array(self, hand_index=0):
+        """(21, 3) view of the normalized landmarks of one hand, or None."""
+        if hand_index < self.hand_count:
+            return self.landmarks[hand_index]
         return None
 
+    def get_hand_landmarks(self, hand_index=0):
+        points = self.get_landmark_array(hand_index)
+        if points is None:
+            return None
+        return [(i, x, y, z) for i, (x, y, z) in enumerate(points.tolist())]
+
     def get_finger_positions(self, frame_width, frame_height, hand_index=0):
-        landmarks = self.get_hand_landmarks(hand_index)
-        if not landmarks:
+        points = self.get_landmark_array(hand_index)
+        if points is None:
             return None
-        finger_tips = {
-            'thumb': 4,
-            'index': 8,
-            'middle': 12,
-            'ring': 16,
-            'pinky': 20
-        }
-        positions = {}
-        for name, tip_id in finger_tips.items():
-            landmark = landmarks[tip_id]
-            x = int(landmark[1] * frame_width)
-            y = int(landmark[2] * frame_height)
-            positions[name] = (x, y)
-        return positions
+        tips = (points[list(FINGER_TIPS.values()), :2] * (frame_width, frame_height)).astype(int)
+        return {name: (int(x), int(y)) for name, (x, y) in zip(FINGER_TIPS, tips)}
 
     def get_hand_center(self, frame_width, frame_height, hand_index=0):
-        landmarks = self.get_hand_landmarks(hand_index)
-        if not landmarks:
+        points = self.get_landmark_array(hand_index)
+        if points is None:
             return None
-        xs = [lm[1] for lm in landmarks]
-        ys = [lm[2] for lm in landmarks]
-        center_x = int(np.mean(xs) * frame_width)
-        center_y = int(np.mean(ys) * frame_height)
-        return (center_x, center_y)
+        center_x, center_y = points[:, :2].mean(axis=0)
+        return (int(center_x * frame_width), int(center_y * frame_height))
+
+    def hand_roles(self):
+        return hand_roles(self.hand_ids, self.handedness)
+
+    def get_hand_centers(self, frame_width, frame_height):
+        """(hands, 2) array of pixel centers for every tracked hand."""
+        return (self.landmarks[:, :, :2].mean(axis=1) * (frame_width, frame_height)).astype(int)
 
     def close(self):
         self.hands.close()
+
+
+class ReplayHandTracker(HandTracker):
+    """HandTracker fed with recorded landmarks instead of running MediaPipe."""
+
+    def __init__(self, max_hands=1):
+        self.max_hands = max_hands
+        self.results = None
+        self._landmark_buffer = np.zeros((max_hands, LANDMARK_COUNT, 3), dtype=np.float32)
+        self.landmarks = self._landmark_buffer[:0]
+        self._reset_identities()
+
+    def use_landmarks(self, landmarks, handedness=None):
+        count = min(len(landmarks), self.max_hands)
+        self._landmark_buffer[:count] = landmarks[:count]
+        self.landmarks = self._landmark_buffer[:count]
+        self._identify(handedness[:count] if handedness else None)
+
+    def find_hands(self, frame, draw=True, mark=None):
+        if draw and self.hand_count:
+            draw_landmarks(frame, self.landmarks)
+            if mark:
+                mark("draw")
+        return frame
+
+    def close(self):
+        pass
@@ -1,27 +1,143 @@
+import atexit
+import copy
 import json
 import os
+import tempfile
+import threading
+import time
+import weakref
 from typing import Any, Dict, List
 
+# Managers with writes that still have to reach disk at interpreter exit.
+_managers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all() -> None:
+    for manager in list(_managers):
+        manager.flush()
+
 
 class JsonManager:
-    def __init__(self, base_dir: str = "res"):
+    """Cached access to the JSON resources in ``base_dir`` with buffered, atomic writes."""
+
+    def __init__(self, base_dir: str = "res", check_interval: float = 1.0, write_delay: float = 0.5):
         self.base_dir = base_dir
+        self.check_interval = check_interval
+        self.write_delay = write_delay
+
+        self._lock = threading.RLock()
+        # Serializes flushes so writes of one file reach disk in order, without holding _lock.
+        self._flush_lock = threading.Lock()
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Any] = {}
+        self._write_timer: threading.Timer | None = None
+        _managers.add(self)
 
     def _full_path(self, filename: str) -> str:
         return os.path.join(self.base_dir, filename)
 
-    def load_json(self, filename: str, default: Any = None) -> Any:
+    @staticmethod
+    def _signature(path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _entry(self, filename: str) -> Dict[str, Any]:
+        now = time.monotonic()
+        entry = self._cache.get(filename)
+        if entry is not None and (filename in self._pending or now - entry["checked"] < self.check_interval):
+            return entry
+
         path = self._full_path(filename)
-        if not os.path.exists(path):
+        signature = self._signature(path)
+        if entry is not None and entry["signature"] == signature:
+            entry["checked"] = now
+            return entry
+
+        data = None
+        if signature is not None:
+            try:
+                with open(path, encoding="utf-8") as file:
+                    data = json.load(file)
+            except (OSError, ValueError) as e:
+                if entry is not None:
+                    # Keep serving the last good copy while a file is half-written.
+                    print(f"Config reload error ({filename}): {e}")
+                    entry["checked"] = now
+                    return entry
+                raise
+
+        revision = entry["revision"] + 1 if entry is not None else 0
+        entry = {"data": data, "signature": signature, "checked": now, "revision": revision}
+        self._cache[filename] = entry
+        return entry
+
+    def load_json(self, filename: str, default: Any = None) -> Any:
+        with self._lock:
+            data = self._entry(filename)["data"]
+        if data is None:
             return default
-        with open(path, encoding="utf-8") as file:
-            return json.load(file)
+        return copy.deepcopy(data)
+
+    def revision(self, filename: str) -> int:
+        """Counter bumped every time ``filename`` is (re)loaded with new content."""
+        with self._lock:
+            return self._entry(filename)["revision"]
 
     def save_json(self, filename: str, data: Any) -> None:
+        with self._lock:
+            data = copy.deepcopy(data)
+            entry = self._cache.get(filename)
+            if entry is not None and filename not in self._pending and entry["data"] == data:
+                return
+            self._pending[filename] = data
+            revision = entry["revision"] + 1 if entry is not None else 0
+            signature = entry["signature"] if entry is not None else None
+            self._cache[filename] = {
+                "data": data, "signature": signature, "checked": time.monotonic(), "revision": revision
+            }
+            if self._write_timer is None:
+                self._write_timer = threading.Timer(self.write_delay, self.flush)
+                self._write_timer.daemon = True
+                self._write_timer.start()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                if self._write_timer is not None:
+                    self._write_timer.cancel()
+                    self._write_timer = None
+                pending, self._pending = self._pending, {}
+            for filename, data in pending.items():
+                try:
+                    self._write_atomic(filename, data)
+                except OSError as e:
+                    print(f"Config save error ({filename}): {e}")
+                    continue
+                signature = self._signature(self._full_path(filename))
+                with self._lock:
+                    entry = self._cache.get(filename)
+                    if entry is not None and filename not in self._pending:
+                        entry["signature"] = signature
+
+    def _write_atomic(self, filename: str, data: Any) -> None:
         path = self._full_path(filename)
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as file:
-            json.dump(data, file, ensure_ascii=False, indent=4)
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{filename}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
     def load_profiles(self) -> Dict[str, Dict[str, str]]:
         return self.load_json("profile_config.json", default={})
@@ -1,243 +1,41 @@
 import argparse
-import time
 import threading
-import cv2
-import queue
 from json_manager import JsonManager
 from cli_manager import CLIManager
-from ui.ui_manager import UIManager
-from hand_tracker import HandTracker
-from mouse_controller import MouseController
-from preset_gestures import PresetGestures
 
-def zoom_frame(frame, scale=1.5):
-    if scale <= 1.0:
-        return frame
-    h, w = frame.shape[:2]
-    resized = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
-    new_h, new_w = resized.shape[:2]
-    center_x, center_y = new_w // 2, new_h // 2
-    start_x = center_x - w // 2
-    start_y = center_y - h // 2
-    return resized[start_y:start_y + h, start_x:start_x + w]
+# Heavy modules (cv2, mediapipe, numpy, autopy, pynput, tkinter) are imported
+# only on the paths that need them, so "help" returns immediately.
 
-class ScaleController:
-    def __init__(self, initial_scale=1.5):
-        self.scale = initial_scale
-        self.lock = threading.Lock()
-    
-    def get(self):
-        with self.lock:
-            return self.scale
-    
-    def set(self, value):
-        with self.lock:
-            self.scale = max(1.0, min(3.0, value))
-    
-    def increment(self, delta):
-        with self.lock:
-            self.scale = max(1.0, min(3.0, self.scale + delta))
-
-class VideoThread:
-    def __init__(self, scale_controller):
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.scale_controller = scale_controller
-        self.running = True
-
-    def run(self, frame_queue):
-        while self.running:
-            ret, frame = self.cap.read()
-            if not ret:
-                time.sleep(0.01)
-                continue
-            
-            frame = cv2.flip(frame, 1)
-            
-            current_scale = self.scale_controller.get()
-            frame_zoomed = zoom_frame(frame, current_scale)
-            
-            try:
-                frame_queue.put_nowait(frame_zoomed)
-            except queue.Full:
-                pass
-            
-            time.sleep(0.001)
-
-    def stop(self):
-        self.running = False
-        self.cap.release()
-
-class DisplayThread:
-    def __init__(self, frame_queue, scale_controller):
-        self.frame_queue = frame_queue
-        self.scale_controller = scale_controller
-        self.running = True
-        self.ui_commands = []
-
-    def add_ui_command(self, text, position, color, duration=20):
-        self.ui_commands.append({"text": text, "pos": position, "color": color, "frames": duration})
-
-    def run(self):
-        while self.running:
-            try:
-                frame = self.frame_queue.get(timeout=0.01)
-                current_scale = self.scale_controller.get()
-                
-                cv2.putText(frame, f"ZOOM: {current_scale:.2f}x [+/-]", (10, 30),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.9, (200, 200, 255), 2)
-                
-                for cmd in self.ui_commands[:]:
-                    cv2.putText(frame, cmd["text"], cmd["pos"],
-                               cv2.FONT_HERSHEY_SIMPLEX, 1.1, cmd["color"], 3)
-                    cmd["frames"] -= 1
-                    if cmd["frames"] <= 0:
-                        self.ui_commands.remove(cmd)
-                
-                cv2.imshow("AI Hand Mouse CLI", frame)
-                key = cv2.waitKey(1) & 0xFF
-                
-                if key == ord('+') or key == ord('='):
-                    self.scale_controller.increment(0.1)
-                elif key == ord('-'):
-                    self.scale_controller.increment(-0.1)
-                elif key == ord('q'):
-                    self.running = False
-                
-                self.frame_queue.task_done()
-            except queue.Empty:
-                continue
-            except:
-                continue
-
-    def stop(self):
-        self.running = False
-
-def run_camera(cli, json_manager, stop_flag=None, on_ready_callback=None):
-    scale_controller = ScaleController(cli.main_config.get("scale", 1.5))
-    
-    raw_frame_queue = queue.Queue(maxsize=3)
-    display_queue = queue.Queue(maxsize=3)
-
-    # for Mediapipe
-    video_thread = VideoThread(scale_controller)
-    video_t = threading.Thread(target=video_thread.run, args=(raw_frame_queue,), daemon=True)
-    video_t.start()
-
-    # Showed video and check keys
-    display_thread = DisplayThread(display_queue, scale_controller)
-    display_t = threading.Thread(target=display_thread.run, daemon=True)
-    display_t.start()
-
-    if on_ready_callback:
-        on_ready_callback()
-
-    tracker = HandTracker(max_hands=1)
-    mouse = MouseController(640, 480, smoothing=7)
-    scroll_velocity = 0
-    scroll_decay, scroll_step = 0.3, 0.7
-
-    profile = cli.current_profile
-    print("=== Mode:", cli.mode, "===")
-
-    ONE_SHOT_ACTIONS = {"click", "double_click", "drag"}
-    CONTINUOUS_ACTIONS = {"scroll_down", "scroll_up"}
-
-    drag_active = False
-    gesture_was_active = {}
-    action_cooldown = {}
-    COOLDOWN_FRAMES = 15
+def preload_camera_pipeline(cli=None):
+    import camera_pipeline
+    if cli is None:
+        camera_pipeline.preload()
+    else:
+        camera_pipeline.preload(cli.main_config, cli.current_profile)
 
-    try:
-        while not (stop_flag and stop_flag.is_set()):
-            try:
-                # Get zoomed for mediaipe
-                frame_zoomed = raw_frame_queue.get_nowait()
-            except queue.Empty:
-                time.sleep(0.001)
-                continue
-
-            frame_with_hands = tracker.find_hands(frame_zoomed, draw=True)
-            landmarks = tracker.get_hand_landmarks()
-
-            if landmarks:
-                gestures = PresetGestures(landmarks, frame_zoomed.shape[1], frame_zoomed.shape[0], json_manager)
-                center_pos = tracker.get_hand_center(frame_zoomed.shape[1], frame_zoomed.shape[0])
-
-                if center_pos and "mouse_move" in profile:
-                    mouse.smooth_move(center_pos[0], center_pos[1])
-                    cv2.circle(frame_with_hands, center_pos, 12, (0, 255, 255), cv2.FILLED)
-
-                for action, gesture_name in profile.items():
-                    if action == "mouse_move":
-                        continue
-
-                    if action in ONE_SHOT_ACTIONS and action in action_cooldown and action_cooldown[action] > 0:
-                        action_cooldown[action] -= 1
-                        continue
-
-                    gesture_now = gestures.detect(gesture_name)
-                    gesture_prev = gesture_was_active.get(action, False)
-                    edge_triggered = gesture_now and not gesture_prev
-                    gesture_was_active[action] = gesture_now
+def run_camera(*args, **kwargs):
+    # Concurrent imports wait on the module lock, so this also waits for a running preload.
+    from camera_pipeline import run_camera as run
+    return run(*args, **kwargs)
 
-                    if action in ONE_SHOT_ACTIONS and edge_triggered:
-                        action_cooldown[action] = COOLDOWN_FRAMES
-                        
-                        if action == "click":
-                            mouse.click('left')
-                            display_thread.add_ui_command("CLICK!", (50, 50), (0, 0, 255))
-                        elif action == "double_click":
-                            mouse.double_click()
-                            display_thread.add_ui_command("DCLICK!", (50, 80), (255, 0, 255))
-                        elif action == "drag":
-                            mouse.toggle_drag(start=True)
-                            drag_active = True
-                            display_thread.add_ui_command("DRAG ON", (50, 110), (0, 255, 255))
-
-                    elif action == "drag" and not gesture_now and drag_active:
-                        mouse.toggle_drag(start=False)
-                        drag_active = False
-                        display_thread.add_ui_command("DRAG OFF", (50, 110), (0, 165, 255))
-
-                    elif action in CONTINUOUS_ACTIONS and gesture_now:
-                        if action == "scroll_down":
-                            scroll_velocity += 2
-                            display_thread.add_ui_command("SCROLL DWON", (50, 200), (0, 255, 0), duration=5)
-                        elif action == "scroll_up":
-                            scroll_velocity -= 2
-                            display_thread.add_ui_command("SCROLL UP", (50, 230), (255, 255, 0), duration=5)
-
-            if abs(scroll_velocity) >= 1:
-                mouse.scroll('down' if scroll_velocity > 0 else 'up', amount=scroll_step)
-                scroll_velocity *= scroll_decay
-
-            try:
-                display_queue.put_nowait(frame_with_hands)
-            except queue.Full:
-                pass
-
-            time.sleep(0.001)
-
-    except KeyboardInterrupt:
-        pass
-    finally:
-        cli.main_config["scale"] = scale_controller.get()
-        if drag_active:
-            mouse.toggle_drag(start=False)
-        cli.persist_state()
-        display_thread.stop()
-        video_thread.stop()
-        tracker.close()
-        cv2.destroyAllWindows()
-        time.sleep(0.5)
-        print("Camera stopped")
+def camera_session(*args, **kwargs):
+    from camera_pipeline import CameraSession
+    return CameraSession(*args, **kwargs)
 
 def main():
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument("mode", nargs="?", default=None)
-    args = parser.parse_args()
+    parser.add_argument("--source", default=None,
+                        help="camera[:id], video:PATH, images:DIR, landmarks:DIR or a recording dir")
+    parser.add_argument("--record", default=None, help="directory to record frames, timestamps and landmarks")
+    parser.add_argument("--metrics", action="store_true", help="show the latency overlay (toggle with 'm')")
+    parser.add_argument("--headless", action="store_true", help="track without a preview window or any drawing")
+    parser.add_argument("--multiprocess", action="store_true",
+                        help="run capture and hand inference in separate processes")
+    parser.add_argument("--metrics-dump", default=None, help="periodically append metrics to a .jsonl or .csv file")
+    parser.add_argument("--profile", type=float, default=None, metavar="SECONDS",
+                        help="sample all pipeline threads for SECONDS once tracking starts ('p' in the preview)")
+    args, _ = parser.parse_known_args()
     
     json_manager = JsonManager()
     
@@ -246,50 +44,93 @@ def main():
         if cli.is_help_requested():
             cli.show_help()
             return
+        if cli.mode == "configuration":
+            print(cli.get_text("configuration"))
+            return
         print(f"CLI Mode: {cli.mode}")
-        run_camera(cli, json_manager)
+        run_camera(cli, json_manager, source_spec=args.source, record_path=args.record,
+                   show_metrics=args.metrics, metrics_path=args.metrics_dump, multiprocess=args.multiprocess,
+                   headless=args.headless, profile_seconds=args.profile)
         return
     
     print("GUI Mode")
-    ui = UIManager(json_manager)
+    from event_bus import EventBus, TOGGLE_CAMERA, CAMERA_STARTING, CAMERA_STATUS, UI_CLOSED
+    from ui.ui_manager import UIManager
+    bus = EventBus()
+    # The main loop sleeps until the UI or the camera session has something to say.
+    events = bus.queue((TOGGLE_CAMERA, CAMERA_STATUS, UI_CLOSED))
+    ui = UIManager(json_manager, bus)
     ui.start()
+    # Import OpenCV/MediaPipe and build the hand model while the window is already up;
+    # the first start uses that tracker. Other sources bring their own landmarks.
+    warm_cli = None if args.source or args.multiprocess else ui.cli_manager
+    preload = threading.Thread(target=preload_camera_pipeline, args=(warm_cli,), daemon=True)
+    preload.start()
     
-    camera_thread = None
+    # One session for the whole GUI run: start/stop only pause and resume it.
+    session = None
+    session_lock = threading.Lock()
     camera_running = False
     camera_stop_flag = threading.Event()
-    
-    def on_camera_ready():
-        ui.send_to_ui({"event": "camera_status", "data": {"running": True}})
+
+    def start_camera():
+        nonlocal session
+        with session_lock:
+            if session is None:
+                session = camera_session(
+                    ui.cli_manager, json_manager, source_spec=args.source, record_path=args.record,
+                    show_metrics=args.metrics, metrics_path=args.metrics_dump, multiprocess=args.multiprocess,
+                    headless=args.headless, bus=bus, profile_seconds=args.profile,
+                    release_after=json_manager.load_main_config().get("camera_session", {}).get("release_after")
+                )
+            try:
+                session.resume()
+            except Exception as e:
+                # open() has already closed what it started; the next start retries.
+                print(f"Camera start error: {e}")
+                bus.publish(CAMERA_STATUS, running=False)
+                return
+            if camera_stop_flag.is_set():
+                # Stop was pressed while the session was still opening.
+                session.pause()
     
     try:
         while True:
-            signal = ui.get_signal()
-            if signal and signal["event"] == "toggle_camera":
-                print(f"Toggle camera: {'START' if not camera_running else 'STOP'}")
-                
-                if not camera_running:
-                    camera_running = True
-                    camera_stop_flag.clear()
-                    ui.send_to_ui({"event": "camera_starting", "data": {}})
-                    
-                    camera_thread = threading.Thread(
-                        target=run_camera,
-                        args=(ui.cli_manager, json_manager, camera_stop_flag, on_camera_ready),
-                        daemon=True
-                    )
-                    camera_thread.start()
-                    
-                else:
+            event = events.get()
+            if event is None or event.kind == UI_CLOSED:
+                break
+
+            if event.kind == CAMERA_STATUS:
+                # The session stopped on its own (e.g. a replayed source ended).
+                if not event.data["running"]:
                     camera_running = False
                     camera_stop_flag.set()
-                    ui.send_to_ui({"event": "camera_status", "data": {"running": False}})
-    
-            time.sleep(0.01)
+                continue
+
+            print(f"Toggle camera: {'START' if not camera_running else 'STOP'}")
+            
+            if not camera_running:
+                camera_running = True
+                camera_stop_flag.clear()
+                bus.publish(CAMERA_STARTING)
+                
+                # Only the first start opens the camera and loads the model.
+                threading.Thread(target=start_camera, daemon=True).start()
+                
+            else:
+                camera_running = False
+                camera_stop_flag.set()
+                if session:
+                    session.pause()
+                else:
+                    bus.publish(CAMERA_STATUS, running=False)
             
     except KeyboardInterrupt:
         pass
     finally:
         camera_stop_flag.set()
+        if session:
+            session.close()
         ui.stop()
 
 if __name__ == "__main__":
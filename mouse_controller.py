@@ -1,50 +1,218 @@
-import autopy
-from pynput.mouse import Controller
+import threading
+import time
+from collections import deque
+
 import numpy as np
 
+from cursor_filters import ExponentialFilter
+
+# Input backends are imported by the first MouseController, not at module load.
+autopy = None
+Controller = None
+
+def load_backends():
+    global autopy, Controller
+    if autopy is None:
+        import autopy as autopy_module
+        from pynput.mouse import Controller as pynput_controller
+        autopy, Controller = autopy_module, pynput_controller
+
+class InputWorker:
+    """Runs synthetic input on its own thread so a slow desktop never stalls tracking."""
+
+    def __init__(self, metrics=None, max_pending=64):
+        self.metrics = metrics
+        self.max_pending = max_pending
+        self._condition = threading.Condition()
+        self._commands = deque()
+        self._move = None
+        self._running = True
+        self.stats = {"submitted": 0, "executed": 0, "coalesced": 0, "dropped": 0, "max_depth": 0}
+        self._thread = threading.Thread(target=self._run, name="mouse", daemon=True)
+        self._thread.start()
+
+    def move(self, fn, *args):
+        with self._condition:
+            if self._running:
+                if self._move is not None:
+                    self.stats["coalesced"] += 1
+                    self._count("input_coalesced")
+                # Moves are superseded by the next one, so a queued move may be dropped.
+                self._move = (fn, args, time.monotonic(), True)
+                self.stats["submitted"] += 1
+                self._condition.notify()
+                return
+        fn(*args)
+
+    def submit(self, fn, *args, droppable=False):
+        """Queues a command; when the queue is full only ``droppable`` ones (moves, scrolls) are lost.
+
+        After close() nothing drains the queue, so commands run on the caller's
+        thread: a button release sent by a late reset must still reach the OS.
+        """
+        with self._condition:
+            if self._running:
+                self._enqueue(fn, args, droppable)
+                return
+        fn(*args)
+
+    def _enqueue(self, fn, args, droppable):
+        if self._move is not None:
+            self._commands.append(self._move)
+            self._move = None
+        if len(self._commands) >= self.max_pending:
+            if droppable:
+                self.stats["dropped"] += 1
+                self._count("input_dropped")
+                return
+            # Presses, releases and clicks must run, or the OS button state
+            # no longer matches is_dragging: make room, or queue past the limit.
+            self._drop_oldest_droppable()
+        self._commands.append((fn, args, time.monotonic(), droppable))
+        self.stats["submitted"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self._commands))
+        self._condition.notify()
+
+    def _drop_oldest_droppable(self):
+        for index, command in enumerate(self._commands):
+            if command[3]:
+                del self._commands[index]
+                self.stats["dropped"] += 1
+                self._count("input_dropped")
+                return
+
+    def depth(self):
+        with self._condition:
+            return len(self._commands) + (self._move is not None)
+
+    def _count(self, name):
+        if self.metrics:
+            self.metrics.count(name)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._commands or self._move or not self._running)
+                if self._commands:
+                    command = self._commands.popleft()
+                elif self._move is not None:
+                    command, self._move = self._move, None
+                else:
+                    return
+            fn, args, submitted, _ = command
+            fn(*args)
+            self.stats["executed"] += 1
+            if self.metrics:
+                self.metrics.observe("input_lag", time.monotonic() - submitted)
+
+    def close(self, timeout=1.0):
+        """Executes what is already queued, then stops the thread."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout)
+
+
 class MouseController:
-    def __init__(self, frame_width, frame_height, smoothing=7):
+    def __init__(self, frame_width, frame_height, smoothing=7, scale_controller=None, asynchronous=True, metrics=None,
+                 cursor_filter=None, prediction=False, prediction_lead=0.0, output_rate=0):
+        load_backends()
         self.pynput_mouse = Controller()
+        self.scale_controller = scale_controller
         self.frame_width = frame_width
         self.frame_height = frame_height
         self.smoothing = smoothing
-        
+
         self.screen_width, self.screen_height = autopy.screen.size()
-        
+
         self.prev_x = 0
         self.prev_y = 0
-        
+
         self.margin = 100
-        
+
         self.is_dragging = False
-        
+        self.worker = InputWorker(metrics) if asynchronous else None
+
+        self.filter = cursor_filter or ExponentialFilter(smoothing)
+        # With prediction the cursor is extrapolated from the sample's capture
+        # time to "now" (+ prediction_lead), hiding the pipeline latency.
+        self.prediction = prediction
+        self.prediction_lead = prediction_lead
+        self._filter_lock = threading.Lock()
+        self._last_update = None
+        self._output_stop = threading.Event()
+        self._output_thread = None
+        if output_rate and output_rate > 0:
+            self._output_thread = threading.Thread(target=self._output_loop, args=(1.0 / output_rate,),
+                                                   name="mouse_output", daemon=True)
+            self._output_thread.start()
+
+    def _dispatch(self, fn, *args, droppable=False):
+        if self.worker:
+            self.worker.submit(fn, *args, droppable=droppable)
+        else:
+            fn(*args)
+
     def convert_coordinates(self, x, y):
+        if self.scale_controller is not None:
+            x, y = self.scale_controller.transform().to_zoomed(x, y, self.frame_width, self.frame_height)
+
         x_clamped = np.clip(x, self.margin, self.frame_width - self.margin)
         y_clamped = np.clip(y, self.margin, self.frame_height - self.margin)
-        
+
         x_normalized = (x_clamped - self.margin) / (self.frame_width - 2 * self.margin)
         y_normalized = (y_clamped - self.margin) / (self.frame_height - 2 * self.margin)
-        
+
         screen_x = int(x_normalized * self.screen_width)
         screen_y = int(y_normalized * self.screen_height)
-        
+
         return screen_x, screen_y
-    
-    def smooth_move(self, x, y):
+
+    def smooth_move(self, x, y, timestamp=None):
+        """Feeds a hand position captured at ``timestamp`` (time.monotonic) to the cursor filter."""
         screen_x, screen_y = self.convert_coordinates(x, y)
-        
-        smooth_x = self.prev_x + (screen_x - self.prev_x) / self.smoothing
-        smooth_y = self.prev_y + (screen_y - self.prev_y) / self.smoothing
-        
+        now = time.monotonic()
+
+        with self._filter_lock:
+            smooth_x, smooth_y = self.filter.update(screen_x, screen_y, now if timestamp is None else timestamp)
+            if self.prediction:
+                smooth_x, smooth_y = self.filter.predict(now + self.prediction_lead)
+            self._last_update = now
+
         self.prev_x = smooth_x
         self.prev_y = smooth_y
-        
+
+        if self._output_thread is None:
+            self._move_to(smooth_x, smooth_y)
+
+    def _move_to(self, x, y):
+        x = int(min(max(x, 0), self.screen_width - 1))
+        y = int(min(max(y, 0), self.screen_height - 1))
+        if self.worker:
+            self.worker.move(self._move, x, y)
+        else:
+            self._move(x, y)
+
+    def _output_loop(self, interval):
+        # Emits interpolated/predicted positions between landmark samples.
+        while not self._output_stop.wait(interval):
+            now = time.monotonic()
+            with self._filter_lock:
+                if self._last_update is None or now - self._last_update > 0.25:
+                    continue
+                x, y = self.filter.predict(now + self.prediction_lead if self.prediction else now)
+            self._move_to(x, y)
+
+    def _move(self, x, y):
         try:
-            autopy.mouse.move(int(smooth_x), int(smooth_y))
+            autopy.mouse.move(x, y)
         except Exception as e:
             print(f"Mouse moving error: {e}")
-    
+
     def click(self, button='left'):
+        self._dispatch(self._click, button)
+
+    def _click(self, button):
         try:
             if button == 'left':
                 autopy.mouse.click()
@@ -52,26 +220,37 @@ class MouseController:
                 autopy.mouse.click(autopy.mouse.Button.RIGHT)
         except Exception as e:
             print(f"Click error: {e}")
-    
+
     def double_click(self):
+        self._dispatch(self._double_click)
+
+    def _double_click(self):
         try:
             autopy.mouse.click()
             autopy.mouse.click()
         except Exception as e:
             print(f"Double click error: {e}")
-    
+
     def toggle_drag(self, start=True):
+        # Drag state is tracked here so callers see it immediately; the
+        # button itself is toggled in order with the other commands.
+        if start and not self.is_dragging:
+            self.is_dragging = True
+            self._dispatch(self._toggle, True)
+        elif not start and self.is_dragging:
+            self.is_dragging = False
+            self._dispatch(self._toggle, False)
+
+    def _toggle(self, down):
         try:
-            if start and not self.is_dragging:
-                autopy.mouse.toggle(down=True)
-                self.is_dragging = True
-            elif not start and self.is_dragging:
-                autopy.mouse.toggle(down=False)
-                self.is_dragging = False
+            autopy.mouse.toggle(down=down)
         except Exception as e:
             print(f"Drag error: {e}")
-    
+
     def scroll(self, direction, amount=3):
+        self._dispatch(self._scroll, direction, amount, droppable=True)
+
+    def _scroll(self, direction, amount):
         try:
             if direction == 'up':
                 self.pynput_mouse.scroll(0, amount)
@@ -79,8 +258,15 @@ class MouseController:
                 self.pynput_mouse.scroll(0, -amount)
         except Exception as e:
             print(f"Scroll error: {e}")
-    
+
     def get_distance(self, point1, point2):
         x1, y1 = point1
         x2, y2 = point2
         return np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+
+    def close(self):
+        self._output_stop.set()
+        if self._output_thread:
+            self._output_thread.join(timeout=1.0)
+        if self.worker:
+            self.worker.close()
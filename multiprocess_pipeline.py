@@ -0,0 +1,224 @@
+"""Capture and inference in separate processes, sharing frames through shared memory."""
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from frame_pool import FramePool
+from frame_sources import FrameSource, open_source
+
+HEADER_SLOTS_OFFSET = 1
+
+
+class SharedFrameRing:
+    """Fixed-size ring of frames in shared memory, guarded by per-slot sequence numbers (a seqlock)."""
+
+    def __init__(self, shape, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        header_bytes = 8 * (slots + 1)
+        stamp_bytes = 8 * slots
+        frame_bytes = int(np.prod(self.shape))
+        size = header_bytes + stamp_bytes + frame_bytes * slots
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Spawned workers share the parent's resource tracker, so attaching
+            # does not add a second registration; only the creator unlinks.
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+        buf = self.shm.buf
+        self._seqs = np.ndarray((slots + 1,), dtype=np.int64, buffer=buf[:header_bytes])
+        self._stamps = np.ndarray((slots,), dtype=np.float64, buffer=buf[header_bytes:header_bytes + stamp_bytes])
+        self._frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=buf[header_bytes + stamp_bytes:size])
+        if self.owner:
+            self._seqs[:] = -1
+
+    def write_slot(self, seq):
+        """Marks the slot for ``seq`` as being written and returns its frame buffer."""
+        slot = seq % self.slots
+        self._seqs[HEADER_SLOTS_OFFSET + slot] = -1
+        return self._frames[slot]
+
+    def publish(self, seq, timestamp):
+        slot = seq % self.slots
+        self._stamps[slot] = timestamp
+        self._seqs[HEADER_SLOTS_OFFSET + slot] = seq
+        self._seqs[0] = seq
+
+    def read(self, seq, out=None):
+        """Copies frame ``seq`` into ``out`` (or a new array); None if it was overwritten."""
+        slot = seq % self.slots
+        if self._seqs[HEADER_SLOTS_OFFSET + slot] != seq:
+            return None
+        if out is None:
+            out = np.empty(self.shape, dtype=np.uint8)
+        np.copyto(out, self._frames[slot])
+        if self._seqs[HEADER_SLOTS_OFFSET + slot] != seq:
+            return None
+        return out
+
+    @property
+    def latest(self):
+        return int(self._seqs[0])
+
+    def close(self):
+        # Views must go before the buffer can be released.
+        del self._seqs, self._stamps, self._frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def capture_worker(source_spec, camera_id, setup_conn, frame_conn, stop_event, slots, capture_settings=None):
+    source = open_source(source_spec, camera_id, capture=capture_settings)
+    # The frame is copied into the ring right away, so one decode buffer is enough.
+    source.use_pool(FramePool(1))
+    ring = None
+    seq = 0
+    try:
+        while not stop_event.is_set():
+            packet = source.read()
+            if packet is None:
+                break
+            if ring is None:
+                ring = SharedFrameRing(packet.frame.shape, slots)
+                setup_conn.send((ring.name, ring.shape))
+            # Mirror straight into shared memory; no intermediate frame.
+            cv2.flip(packet.frame, 1, dst=ring.write_slot(seq))
+            packet.release()
+            ring.publish(seq, packet.timestamp)
+            frame_conn.send((seq, packet.timestamp))
+            seq += 1
+    finally:
+        frame_conn.send(None)
+        source.release()
+        if ring is None:
+            setup_conn.send(None)
+        else:
+            # Give the other processes a moment to detach before unlinking.
+            stop_event.wait(1.0)
+            ring.close()
+
+
+def inference_worker(ring_name, shape, slots, frame_conn, result_conn, stop_event, tracker_options,
+                     governor_settings=None):
+    from hand_tracker import HandTracker
+    from quality_governor import QualityGovernor
+
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    tracker = HandTracker(**tracker_options)
+    governor = QualityGovernor.from_config(governor_settings)
+    frame = np.empty(shape, dtype=np.uint8)
+    try:
+        while not stop_event.is_set():
+            if not frame_conn.poll(0.1):
+                continue
+            message = frame_conn.recv()
+            skipped = 0
+            while message is not None and frame_conn.poll():
+                message = frame_conn.recv()
+                skipped += 1
+            if message is None:
+                break
+            seq, timestamp = message
+            if ring.read(seq, out=frame) is None:
+                continue
+            started = time.monotonic()
+            tracker.find_hands(frame, draw=False)
+            if governor:
+                level = governor.observe(time.monotonic() - started)
+                if level:
+                    tracker.set_quality(**level)
+            result_conn.send((seq, timestamp, tracker.landmarks.copy(), tracker.detected_handedness, skipped))
+    finally:
+        result_conn.send(None)
+        tracker.close()
+        ring.close()
+
+
+class MultiProcessSource(FrameSource):
+    """Live source whose packets already carry landmarks from the inference process."""
+    live = True
+    preprocessed = True
+
+    def __init__(self, source_spec=None, camera_id=0, slots=4, startup_timeout=10.0, governor_settings=None,
+                 capture_settings=None, **tracker_options):
+        context = mp.get_context("spawn")
+        self.stop_event = context.Event()
+        setup_recv, setup_send = context.Pipe(duplex=False)
+        frame_recv, frame_send = context.Pipe(duplex=False)
+        result_recv, result_send = context.Pipe(duplex=False)
+        self.result_conn = result_recv
+        self._dropped = 0
+
+        self.capture_process = context.Process(
+            target=capture_worker,
+            args=(source_spec, camera_id, setup_send, frame_send, self.stop_event, slots, capture_settings),
+            daemon=True,
+        )
+        self.capture_process.start()
+        if not setup_recv.poll(startup_timeout):
+            self.release()
+            raise RuntimeError("Capture process did not start")
+        setup = setup_recv.recv()
+        if setup is None:
+            self.release()
+            raise RuntimeError("Capture process produced no frames")
+        ring_name, shape = setup
+
+        self.ring = SharedFrameRing(shape, slots, name=ring_name)
+        self.inference_process = context.Process(
+            target=inference_worker,
+            args=(ring_name, shape, slots, frame_recv, result_send, self.stop_event, tracker_options,
+                  governor_settings),
+            daemon=True,
+        )
+        self.inference_process.start()
+
+    def read(self):
+        while not self.stop_event.is_set():
+            if not self.result_conn.poll(0.1):
+                if not self.inference_process.is_alive():
+                    return None
+                continue
+            message = self.result_conn.recv()
+            if message is None:
+                return None
+            seq, timestamp, landmarks, handedness, skipped = message
+            self._dropped += skipped
+            buffer = self._acquire(self.ring.shape)
+            frame = self.ring.read(seq, out=buffer)
+            if frame is None:
+                # The capture process already reused this slot.
+                if buffer is not None:
+                    self.pool.release(buffer)
+                self._dropped += 1
+                continue
+            packet = self._packet(frame, buffer, timestamp, seq, landmarks, handedness)
+            packet.mark("inference")
+            return packet
+        return None
+
+    def take_dropped(self):
+        dropped, self._dropped = self._dropped, 0
+        return dropped
+
+    def release(self):
+        self.stop_event.set()
+        for name in ("inference_process", "capture_process"):
+            process = getattr(self, name, None)
+            if process is None:
+                continue
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        ring = getattr(self, "ring", None)
+        if ring is not None:
+            self.ring = None
+            ring.close()
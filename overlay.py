@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+class TextSprite:
+    """Text rasterized once into a BGR patch plus alpha, blended onto frames."""
+    __slots__ = ("color", "alpha", "inverse_alpha", "baseline_offset")
+
+    def __init__(self, text, color, font_scale, thickness, font=FONT):
+        (width, height), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+        pad = thickness
+        mask = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+        cv2.putText(mask, text, (pad, height + pad), font, font_scale, 255, thickness, cv2.LINE_AA)
+        self.alpha = mask.astype(np.float32) / 255.0
+        self.inverse_alpha = 1.0 - self.alpha
+        self.color = np.empty(mask.shape + (3,), dtype=np.uint8)
+        self.color[:] = color
+        # putText positions are the text baseline; sprites are placed by their top-left corner.
+        self.baseline_offset = (pad, height + pad)
+
+    def blend(self, frame, position):
+        x = int(position[0]) - self.baseline_offset[0]
+        y = int(position[1]) - self.baseline_offset[1]
+        h, w = self.inverse_alpha.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        patch = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+        region = frame[y0:y1, x0:x1]
+        # One pass in C, written straight back into the frame.
+        cv2.blendLinear(self.color[patch], region, self.alpha[patch], self.inverse_alpha[patch], dst=region)
+
+
+class OverlayRenderer:
+    """Bounded, thread-safe overlay messages drawn from a sprite cache."""
+
+    def __init__(self, max_messages=16, cache_size=128):
+        self.max_messages = max_messages
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._messages = OrderedDict()
+        self._sprites = OrderedDict()
+
+    def post(self, text, position, color, duration=0.7, font_scale=1.1, thickness=3, key=None):
+        key = position if key is None else key
+        with self._lock:
+            self._messages.pop(key, None)
+            self._messages[key] = (text, position, tuple(color), font_scale, thickness, time.monotonic() + duration)
+            while len(self._messages) > self.max_messages:
+                self._messages.popitem(last=False)
+
+    def sprite(self, text, color, font_scale, thickness):
+        cache_key = (text, tuple(color), round(font_scale, 3), thickness)
+        sprite = self._sprites.get(cache_key)
+        if sprite is None:
+            sprite = TextSprite(text, color, font_scale, thickness)
+            self._sprites[cache_key] = sprite
+            if len(self._sprites) > self.cache_size:
+                self._sprites.popitem(last=False)
+        else:
+            self._sprites.move_to_end(cache_key)
+        return sprite
+
+    def text(self, frame, text, position, color, font_scale=0.9, thickness=2):
+        """Draws one line immediately through the sprite cache; meant for text that rarely changes."""
+        self.sprite(text, color, font_scale, thickness).blend(frame, position)
+
+    def render(self, frame, scale=1.0):
+        now = time.monotonic()
+        with self._lock:
+            for key in [key for key, message in self._messages.items() if message[5] <= now]:
+                del self._messages[key]
+            messages = list(self._messages.values())
+        for text, (x, y), color, font_scale, thickness, _ in messages:
+            self.text(frame, text, (x * scale, y * scale), color, font_scale * scale, thickness)
@@ -0,0 +1,135 @@
+import csv
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class PipelineMetrics:
+    """Rolling per-stage latency histograms and frame counters for run_camera.
+
+    Stage latency is the time between a stage's stamp on a FramePacket and the
+    previous stamp; "total" is capture to the last stamp (glass to cursor/screen).
+    """
+
+    def __init__(self, window=600, refresh_interval=0.5):
+        self.window = window
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counters = {"processed": 0, "dropped": 0, "stale": 0}
+        self._snapshot = {}
+        self._snapshot_time = 0.0
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self._observe(stage, seconds)
+
+    def _observe(self, stage, seconds):
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples[stage] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def record(self, packet):
+        stamps = packet.stamps
+        with self._lock:
+            for (_, previous), (stage, current) in zip(stamps, stamps[1:]):
+                self._observe(stage, current - previous)
+            if len(stamps) > 1:
+                self._observe("total", stamps[-1][1] - stamps[0][1])
+
+    def snapshot(self):
+        """Percentiles in milliseconds plus counters; recomputed at most every refresh_interval."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._snapshot_time < self.refresh_interval:
+                return self._snapshot
+            stages = {stage: np.array(samples) for stage, samples in self._samples.items() if samples}
+            counters = dict(self._counters)
+
+        snapshot = {"stages": {}, "counters": counters}
+        for stage, samples in stages.items():
+            values = np.percentile(samples, PERCENTILES) * 1000.0
+            entry = {f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, values)}
+            entry["count"] = int(samples.size)
+            snapshot["stages"][stage] = entry
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._snapshot_time = now
+        return snapshot
+
+    def overlay_lines(self):
+        snapshot = self.snapshot()
+        counters = snapshot.get("counters", {})
+        lines = [
+            "frames {processed}  dropped {dropped}  stale {stale}".format(
+                processed=counters.get("processed", 0),
+                dropped=counters.get("dropped", 0),
+                stale=counters.get("stale", 0),
+            )
+        ]
+        for stage, entry in snapshot.get("stages", {}).items():
+            lines.append(f"{stage:<10} {entry['p50']:6.2f} {entry['p95']:6.2f} {entry['p99']:6.2f} ms")
+        return lines
+
+    def dump(self, path):
+        snapshot = dict(self.snapshot(), time=time.time())
+        if path.endswith(".csv"):
+            self._dump_csv(path, snapshot)
+            return
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(snapshot) + "\n")
+
+    @staticmethod
+    def _dump_csv(path, snapshot):
+        columns = ["time", "stage"] + [f"p{p}" for p in PERCENTILES] + ["count"]
+        with open(path, "a", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            if file.tell() == 0:
+                writer.writerow(columns)
+            for stage, entry in snapshot["stages"].items():
+                writer.writerow([snapshot["time"], stage] + [entry[c] for c in columns[2:]])
+            for name, value in snapshot["counters"].items():
+                writer.writerow([snapshot["time"], name, "", "", "", value])
+
+
+class MetricsDumper:
+    """Periodically appends PipelineMetrics snapshots to a .jsonl or .csv file."""
+
+    def __init__(self, metrics, path, interval=5.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._dump()
+
+    def _dump(self):
+        try:
+            self.metrics.dump(self.path)
+        except OSError as e:
+            print(f"Metrics dump error: {e}")
+
+    def stop(self):
+        self._stop.set()
+        self._dump()
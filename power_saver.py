@@ -0,0 +1,49 @@
+import cv2
+import numpy as np
+
+
+class PowerSaver:
+    """Idle state for when no hand has been seen for ``idle_after`` seconds."""
+
+    def __init__(self, idle_after=5.0, idle_fps=5, motion_threshold=12, motion_fraction=0.01, thumbnail=(64, 48)):
+        self.idle_after = idle_after
+        self.idle_fps = idle_fps
+        self.motion_threshold = motion_threshold
+        self.motion_fraction = motion_fraction
+        self.thumbnail = tuple(thumbnail)
+        self.idle = False
+        self._last_hand = None
+        self._previous = None
+        self._gray = np.empty((thumbnail[1], thumbnail[0]), dtype=np.uint8)
+        self._small = np.empty((thumbnail[1], thumbnail[0], 3), dtype=np.uint8)
+
+    def update(self, hand_present, now):
+        """Returns True when this call put the session to sleep."""
+        if hand_present or self._last_hand is None:
+            self._last_hand = now
+            return False
+        if not self.idle and now - self._last_hand >= self.idle_after:
+            self.idle = True
+            self._previous = None
+            return True
+        return False
+
+    def detect_motion(self, frame):
+        cv2.resize(frame, self.thumbnail, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        previous, self._previous = self._previous, self._gray.copy()
+        if previous is None:
+            return False
+        changed = cv2.absdiff(self._gray, previous) > self.motion_threshold
+        return np.count_nonzero(changed) >= self.motion_fraction * changed.size
+
+    def wake(self, now):
+        self.idle = False
+        self._last_hand = now
+
+    @classmethod
+    def from_config(cls, settings):
+        """None unless ``settings`` (main_config "power_save") is enabled."""
+        if not settings or not settings.get("enabled", False):
+            return None
+        return cls(**{key: value for key, value in settings.items() if key != "enabled"})
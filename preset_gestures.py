@@ -1,5 +1,6 @@
 import numpy as np
 from json_manager import JsonManager
+from gesture_classifier import MODEL_FILE, GestureClassifier, landmark_features
 
 class PresetGestures:
     def __init__(
@@ -71,3 +72,235 @@ class PresetGestures:
         x2 = int(self.landmarks[tip2_id][1] * self.frame_width)
         y2 = int(self.landmarks[tip2_id][2] * self.frame_height)
         return float(np.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2))
+
+
+GESTURES_FILE = "gestures.json"
+FINGER_TIP_IDS = {'thumb': 4, 'index': 8, 'middle': 12, 'ring': 16, 'pinky': 20}
+HAND_ROLES = ("any", "left", "right")
+
+
+def parse_binding(value):
+    """A profile entry is ``"gesture"`` or ``{"gesture": ..., "hand": "any" | "left" | "right"}``."""
+    if isinstance(value, dict):
+        hand = value.get("hand", "any")
+        if hand not in HAND_ROLES:
+            raise ValueError(f"Unknown hand {hand!r} for gesture {value.get('gesture')!r}")
+        return value["gesture"], hand
+    return value, "any"
+
+
+class GestureEngine:
+    """Compiles a profile's gestures once and evaluates all of them (for all hands) in one vectorized pass."""
+
+    def __init__(self, profile: dict, json_manager: JsonManager | None = None, hysteresis: float = 1.0):
+        self.json_manager = json_manager or JsonManager()
+        self.profile = dict(profile)
+        self.hysteresis = hysteresis
+        self._model_files = []
+        self.compile(self.json_manager.load_gestures())
+        self._revisions = self._current_revisions()
+
+    def _current_revisions(self) -> tuple:
+        return tuple(self.json_manager.revision(name) for name in [GESTURES_FILE] + self._model_files)
+
+    def refresh(self) -> bool:
+        """Recompiles if gestures.json or a model changed on disk; cheap enough to call every frame."""
+        revisions = self._current_revisions()
+        if revisions == self._revisions:
+            return False
+        self.compile(self.json_manager.load_gestures())
+        self._revisions = self._current_revisions()
+        return True
+
+    def _load_classifier(self, model_file: str):
+        data = self.json_manager.load_json(model_file)
+        if data is None:
+            print(f"Gesture model not found: {model_file} (see gesture_classifier.py)")
+            return None
+        return GestureClassifier.from_dict(data)
+
+    def compile(self, gesture_definitions: list) -> None:
+        definitions = {gesture['name']: gesture for gesture in gesture_definitions}
+        parsed = {action: parse_binding(value) for action, value in self.profile.items()}
+        self.gesture_names = list(dict.fromkeys(gesture for gesture, _ in parsed.values()))
+        # (action, hand role, column in the evaluate_batch result)
+        self.bindings = [(action, hand, self.gesture_names.index(gesture)) for action, (gesture, hand) in parsed.items()]
+        self.per_hand = any(hand != "any" for _, hand, _ in self.bindings)
+
+        # Each block lists its checks gesture by gesture, so one logical_and.reduceat
+        # per block gives the gestures' results. A pair check compares squared
+        # fingertip distances; a y check is ``y[a] - y[b] > offset``.
+        pairs, pair_thresholds, pair_owners = [], [], []
+        y_points, y_offsets, y_owners = [], [], []
+        # model file -> (classifier, label columns, min_votes, gestures) of its checks
+        classifiers = {}
+        default = np.zeros(len(self.gesture_names), dtype=bool)
+
+        for index, name in enumerate(self.gesture_names):
+            if name == "dummy":
+                default[index] = True
+                continue
+            gesture = definitions.get(name)
+            check_type = gesture.get('check') if gesture else None
+
+            if check_type in ("touch", "group_touch"):
+                fingers = gesture["fingers"]
+                threshold = gesture["args"].get("distance_threshold", 40)
+                if check_type == "touch" and ("thumb" not in fingers or len(fingers) != 2):
+                    continue
+                others = [f for f in fingers if f != "thumb"]
+                if not others:
+                    default[index] = True
+                    continue
+                for finger in others:
+                    pairs.append((FINGER_TIP_IDS['thumb'], FINGER_TIP_IDS[finger]))
+                    pair_thresholds.append(threshold)
+                    pair_owners.append(index)
+
+            elif check_type == "fist_index_up":
+                args = gesture["args"]
+                # index extended: tip_y < pip_y - offset  ->  pip_y - tip_y > offset
+                y_points.append((args["pip_ids"][0], args["tip_ids"][0]))
+                y_offsets.append(args["index_tip_to_pip_offset"])
+                y_owners.append(index)
+                # others folded: tip_y > pip_y + offset  ->  tip_y - pip_y > offset
+                for tip_id, pip_id in zip(args["fold_ids"], args["pip_ids"][1:]):
+                    y_points.append((tip_id, pip_id))
+                    y_offsets.append(args["others_folded_offset"])
+                    y_owners.append(index)
+
+            elif check_type == "classifier":
+                args = gesture.get("args", {})
+                model_file = args.get("model", MODEL_FILE)
+                if model_file not in classifiers:
+                    classifiers[model_file] = (self._load_classifier(model_file), [], [], [])
+                classifier, columns, min_votes, owners = classifiers[model_file]
+                label = args.get("label", name)
+                if classifier is None or label not in classifier.labels:
+                    continue
+                columns.append(classifier.labels.index(label))
+                min_votes.append(args.get("min_votes", 0.5))
+                owners.append(index)
+
+        self._default = default
+        # Pair and y checks share one gather and one reduceat. Gathered columns are
+        # [a.x, a.y, b.x, b.y] of every pair (scaled to whole pixels), then [a, b]
+        # y values of every y check; check j passes when its margin is positive:
+        # threshold^2 - squared distance for pairs, y[a] - y[b] - offset for y checks.
+        owners = np.array(pair_owners + y_owners, dtype=np.intp)
+        self._pair_count = len(pairs)
+        self._checks = None
+        if len(owners):
+            pair_ids = np.array(pairs, dtype=np.intp).reshape(-1, 2)
+            y_ids = np.array(y_points, dtype=np.intp).reshape(-1, 2)
+            # Landmark ids and coordinate (0 = x, 1 = y) of every gathered column.
+            ids = np.concatenate([pair_ids[:, 0], pair_ids[:, 0], pair_ids[:, 1], pair_ids[:, 1], y_ids[:, 0], y_ids[:, 1]])
+            coords = np.repeat([0, 1, 0, 1, 1, 1], [len(pairs)] * 4 + [len(y_points)] * 2)
+            # Squared, so no sqrt per frame; a threshold <= 0 never passes, as before.
+            thresholds = np.maximum(np.array(pair_thresholds, dtype=np.float32), 0)
+            offsets = np.array(y_offsets, dtype=np.float32)
+            limits = np.concatenate([thresholds ** 2, offsets])
+            # Active gestures pass up to threshold * hysteresis, or down to offset * (2 - hysteresis).
+            active_limits = np.concatenate([(thresholds * np.float32(self.hysteresis)) ** 2,
+                                            offsets * np.float32(2.0 - self.hysteresis)])
+            starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+            self._checks = (ids, coords, owners, starts, owners[starts], (limits, active_limits))
+        self._gather = {}
+        self._scale = (None, None)
+        # The same checks on Python floats, per gesture, for the single-hand case.
+        scalar_checks = {}
+        for (a, b), threshold, owner in zip(pairs, pair_thresholds, pair_owners):
+            threshold = max(threshold, 0)
+            scalar_checks.setdefault(owner, []).append((True, a, b, (threshold ** 2, (threshold * self.hysteresis) ** 2)))
+        for (a, b), offset, owner in zip(y_points, y_offsets, y_owners):
+            scalar_checks.setdefault(owner, []).append((False, a, b, (offset, offset * (2.0 - self.hysteresis))))
+        self._scalar_checks = list(scalar_checks.items())
+
+        self._model_files = list(classifiers)
+        # Votes are shares, so an active gesture keeps min_votes / hysteresis instead.
+        self._classifiers = [
+            (classifier, np.array(columns, dtype=np.intp), np.array(owners, dtype=np.intp),
+             (np.array(min_votes, dtype=np.float32), np.array(min_votes, dtype=np.float32) / np.float32(self.hysteresis)))
+            for classifier, columns, min_votes, owners in classifiers.values() if columns
+        ]
+
+    def _limits(self, limits, owners, active):
+        if active is None or self.hysteresis == 1.0:
+            return limits[0]
+        return np.where(active[:, owners], limits[1], limits[0])
+
+    def _evaluate_one(self, points, frame_width, frame_height, active):
+        points = points.tolist()
+        result = self._default.tolist()
+        active = active[0].tolist() if active is not None and self.hysteresis != 1.0 else None
+        for gesture, checks in self._scalar_checks:
+            limit_index = 1 if active and active[gesture] else 0
+            passed = True
+            for is_pair, a, b, limits in checks:
+                if is_pair:
+                    dx = int(points[a][0] * frame_width) - int(points[b][0] * frame_width)
+                    dy = int(points[a][1] * frame_height) - int(points[b][1] * frame_height)
+                    passed = dx * dx + dy * dy < limits[limit_index]
+                else:
+                    passed = points[a][1] - points[b][1] > limits[limit_index]
+                if not passed:
+                    break
+            result[gesture] = passed
+        return np.array([result])
+
+    def evaluate_batch(self, hands, frame_width: int, frame_height: int, active=None) -> np.ndarray:
+        """(hands, gestures) bool array for (hands, 21, >=2) normalized points, in one pass.
+
+        ``active`` is the previous (hands, gestures) result for the same hands, for hysteresis.
+        """
+        hands = np.asarray(hands, dtype=np.float32)
+        count = hands.shape[0]
+        if count == 1 and not self._classifiers:
+            # One hand is the common case; a few float comparisons beat any numpy call at this size.
+            return self._evaluate_one(hands[0], frame_width, frame_height, active)
+        result = np.empty((count, len(self._default)), dtype=bool)
+        result[:] = self._default
+        if self._checks is not None:
+            ids, coords, owners, starts, gestures, limits = self._checks
+            pairs = self._pair_count
+            gather = self._gather.get(hands.shape[1:])
+            if gather is None:
+                gather = self._gather[hands.shape[1:]] = ids * hands.shape[2] + coords
+            if self._scale[0] != (frame_width, frame_height):
+                scale = np.tile(np.array([frame_width, frame_height], dtype=np.float32).repeat(pairs), 2)
+                self._scale = ((frame_width, frame_height), scale)
+            values = hands.reshape(count, -1)[:, gather]
+            limits = self._limits(limits, owners, active)
+            margins = np.empty((count, len(owners)), dtype=np.float32)
+            if pairs:
+                # Whole pixels, as PresetGestures does with int().
+                pixels = values[:, :4 * pairs]
+                pixels *= self._scale[1]
+                np.trunc(pixels, out=pixels)
+                deltas = pixels[:, :2 * pairs] - pixels[:, 2 * pairs:]
+                deltas *= deltas
+                np.subtract(limits[..., :pairs], deltas[:, :pairs], out=margins[:, :pairs])
+                margins[:, :pairs] -= deltas[:, pairs:]
+            if pairs < len(owners):
+                y_checks = len(owners) - pairs
+                np.subtract(values[:, 4 * pairs:4 * pairs + y_checks], values[:, 4 * pairs + y_checks:],
+                            out=margins[:, pairs:])
+                margins[:, pairs:] -= limits[..., pairs:]
+            result[:, gestures] = np.logical_and.reduceat(margins > 0, starts, axis=1)
+        if self._classifiers:
+            features = landmark_features(hands, frame_width, frame_height)
+            for classifier, columns, owners, min_votes in self._classifiers:
+                votes = classifier.votes(features)[:, columns]
+                result[:, owners] = votes > self._limits(min_votes, owners, active)
+        return result
+
+    def evaluate_mask(self, points, frame_width: int, frame_height: int) -> np.ndarray:
+        """Returns a bool array aligned with ``gesture_names`` for (21, >=2) normalized points."""
+        points = np.asarray(points, dtype=np.float32)
+        if points.shape[0] < 21:
+            return self._default.copy()
+        return self.evaluate_batch(points[None], frame_width, frame_height)[0]
+
+    def evaluate(self, points, frame_width: int, frame_height: int) -> dict:
+        mask = self.evaluate_mask(points, frame_width, frame_height)
+        return dict(zip(self.gesture_names, mask.tolist()))
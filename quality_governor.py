@@ -0,0 +1,72 @@
+class QualityGovernor:
+    """Steps HandTracker quality down/up to keep inference inside a frame budget."""
+
+    def __init__(self, target_fps=30, budget_fraction=0.8, min_input_scale=0.5, input_scale_step=0.25,
+                 max_model_complexity=1, min_model_complexity=0, headroom=0.6,
+                 down_frames=10, up_frames=90, cooldown=30, smoothing=0.1):
+        self.budget = budget_fraction / float(target_fps)
+        self.headroom = headroom
+        self.down_frames = down_frames
+        self.up_frames = up_frames
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.levels = self._build_levels(min_input_scale, input_scale_step, max_model_complexity, min_model_complexity)
+        self.level = 0
+        self.average = None
+        self._over = 0
+        self._under = 0
+        self._cooldown_left = 0
+
+    @staticmethod
+    def _build_levels(min_input_scale, step, max_complexity, min_complexity):
+        levels = [{"input_scale": 1.0, "model_complexity": c} for c in range(max_complexity, min_complexity - 1, -1)]
+        scale = 1.0 - step
+        while scale >= min_input_scale - 1e-6:
+            levels.append({"input_scale": round(scale, 3), "model_complexity": min_complexity})
+            scale -= step
+        return levels
+
+    @property
+    def current(self):
+        return self.levels[self.level]
+
+    def observe(self, seconds):
+        """Feeds one inference time; returns the new level when it changes, else None."""
+        if self.average is None:
+            self.average = seconds
+        else:
+            self.average += self.smoothing * (seconds - self.average)
+
+        if self._cooldown_left:
+            self._cooldown_left -= 1
+            return None
+
+        if self.average > self.budget:
+            self._over += 1
+            self._under = 0
+        elif self.average < self.budget * self.headroom:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self.down_frames and self.level < len(self.levels) - 1:
+            return self._change(self.level + 1)
+        if self._under >= self.up_frames and self.level > 0:
+            return self._change(self.level - 1)
+        return None
+
+    def _change(self, level):
+        self.level = level
+        self._over = self._under = 0
+        self._cooldown_left = self.cooldown
+        # The new level has different cost; start the average over.
+        self.average = None
+        return self.current
+
+    @classmethod
+    def from_config(cls, settings):
+        """None unless ``settings`` (main_config "quality_governor") is enabled."""
+        if not settings or not settings.get("enabled", False):
+            return None
+        return cls(**{key: value for key, value in settings.items() if key != "enabled"})
@@ -0,0 +1,109 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    """Samples every thread's stack for a limited time and writes folded stacks plus a top-functions report."""
+
+    def __init__(self, duration=10.0, interval=0.005, output_dir="profiles", top=15):
+        self.duration = duration
+        self.interval = interval
+        self.output_dir = output_dir
+        self.top = top
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self, duration=None):
+        """Starts a capture; returns False if one is already running."""
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(duration or self.duration,),
+                                            name="profiler", daemon=True)
+            self._thread.start()
+        print(f"Profiling for {duration or self.duration:g} s")
+        return True
+
+    def stop(self, wait=False):
+        """Ends the capture early; the files are written by the sampler thread."""
+        self._stop.set()
+        thread = self._thread
+        if wait and thread is not None:
+            thread.join()
+
+    def toggle(self):
+        """Starts a capture, or stops the running one; returns True if one was started."""
+        if self.running:
+            self.stop()
+            return False
+        return self.start()
+
+    def _run(self, duration):
+        own = threading.get_ident()
+        stacks = Counter()
+        names = {}
+        ticks = 0
+        started = time.monotonic()
+        deadline = started + duration
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            ticks += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                stacks[ident, tuple(codes)] += 1
+                if ident not in names:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+        try:
+            self._write(stacks, names, ticks, time.monotonic() - started)
+        except OSError as e:
+            print(f"Profile save error: {e}")
+
+    @staticmethod
+    def _label(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _write(self, stacks, names, ticks, elapsed):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S"))
+        thread_names = {ident: names.get(ident, str(ident)) for ident, _ in stacks}
+
+        with open(base + ".folded", "w", encoding="utf-8") as file:
+            for (ident, codes), count in stacks.items():
+                frames = ";".join([thread_names[ident]] + [self._label(code) for code in reversed(codes)])
+                file.write(f"{frames} {count}\n")
+
+        # thread -> samples, and (thread, leaf function) -> samples
+        totals = Counter()
+        self_samples = Counter()
+        for (ident, codes), count in stacks.items():
+            totals[ident] += count
+            if codes:
+                self_samples[ident, codes[0]] += count
+        # Wall time one sample stands for (sampling is slower than interval under load).
+        period = elapsed / max(ticks, 1)
+        lines = [f"{elapsed:.1f} s, {ticks} samples, one every {period * 1000:.1f} ms"]
+        for ident, total in totals.most_common():
+            lines.append("")
+            lines.append(f"{thread_names[ident]}: {total} samples")
+            leaves = sorted(((count, code) for (owner, code), count in self_samples.items() if owner == ident),
+                            key=lambda item: item[0], reverse=True)
+            for count, code in leaves[:self.top]:
+                lines.append(f"  {count / total:6.1%} {count * period * 1000:9.1f} ms  {self._label(code)}")
+        with open(base + ".txt", "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        print("\n".join(lines))
+        print(f"Profile saved: {base}.folded, {base}.txt")
@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RES_DIR = os.path.join(ROOT, "res")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,94 @@
+from action_states import ActionState, ACTION_KINDS, DEFAULT_TIMING, PRESS, REPEAT, TOGGLE, action_timing
+
+
+def make_state(kind, events, **timing):
+    settings = dict(DEFAULT_TIMING, **timing)
+    return ActionState("test", kind, "any", 0, settings,
+                       on_start=lambda: events.append("start"),
+                       on_end=lambda: events.append("end"),
+                       on_repeat=lambda count: events.append(count))
+
+
+def feed(state, samples):
+    for now, raw in samples:
+        state.update(raw, now)
+
+
+def test_press_and_release_are_debounced_in_seconds():
+    events = []
+    state = make_state(TOGGLE, events, press=0.1, release=0.05)
+    feed(state, [(0.0, True), (0.05, True), (0.09, True)])
+    assert events == []
+    state.update(True, 0.1)
+    assert events == ["start"]
+
+    # A one-frame dropout shorter than the release time does not end the drag.
+    feed(state, [(0.2, False), (0.22, True), (0.3, False), (0.34, False)])
+    assert events == ["start"]
+    state.update(False, 0.36)
+    assert events == ["start", "end"]
+
+
+def test_refractory_ignores_a_quick_second_press():
+    events = []
+    state = make_state(PRESS, events, release=0.0, refractory=0.5)
+    feed(state, [(0.0, True), (0.1, False), (0.2, True), (0.3, False)])
+    assert events == ["start"]
+    feed(state, [(0.6, True)])
+    assert events == ["start", "start"]
+
+
+def test_repeat_rate_does_not_depend_on_frame_rate():
+    counts = {}
+    for fps in (15, 60):
+        events = []
+        state = make_state(REPEAT, events, repeat_rate=30.0)
+        feed(state, [(i / fps, True) for i in range(fps + 1)])
+        counts[fps] = sum(events)
+    assert abs(counts[15] - counts[60]) <= 1
+    assert 30 <= counts[60] <= 32
+
+
+def test_repeats_after_a_stall_are_capped():
+    events = []
+    state = make_state(REPEAT, events, repeat_rate=30.0, max_repeats=3)
+    feed(state, [(0.0, True), (2.0, True)])
+    assert events == [1, 3]
+    # The schedule restarts from the stall instead of bursting to catch up.
+    state.update(True, 2.01)
+    assert events == [1, 3]
+
+
+def test_reset_ends_an_engaged_drag_and_forgets_the_gesture():
+    events = []
+    state = make_state(TOGGLE, events, release=0.05, refractory=0.0)
+    feed(state, [(0.0, True), (0.1, False)])
+    state.reset()
+    assert events == ["start", "end"]
+    assert not state.active and not state.engaged
+    state.reset()
+    assert events == ["start", "end"]
+
+    # The pending release was forgotten, so the next frame starts a new drag.
+    state.update(True, 0.2)
+    assert events == ["start", "end", "start"]
+
+
+def test_reset_does_not_end_a_press():
+    events = []
+    state = make_state(PRESS, events)
+    state.update(True, 0.0)
+    state.reset()
+    assert events == ["start"]
+
+
+def test_action_timing_overrides():
+    settings = {"press": 0.02, "unknown": 1, "actions": {"drag": {"release": 0.2}}}
+    drag = action_timing(settings, "drag")
+    click = action_timing(settings, "click")
+    assert drag["press"] == click["press"] == 0.02
+    assert drag["release"] == 0.2
+    assert click["release"] == DEFAULT_TIMING["release"]
+    assert "unknown" not in click
+    assert action_timing(None, "click") == DEFAULT_TIMING
+    assert ACTION_KINDS["drag"] == TOGGLE
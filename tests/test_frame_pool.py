@@ -0,0 +1,32 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from frame_pool import FramePool
+
+SHAPE = (4, 6, 3)
+
+
+def test_release_returns_only_pool_frames():
+    pool = FramePool(count=2)
+    first, second = pool.acquire(SHAPE), pool.acquire(SHAPE)
+    assert pool.acquire(SHAPE) is None
+
+    pool.release(np.empty(SHAPE, dtype=np.uint8))
+    assert pool.acquire(SHAPE) is None
+
+    pool.release(first)
+    pool.release(first)
+    assert pool.acquire(SHAPE) is first
+    assert pool.acquire(SHAPE) is None
+    pool.release(second)
+
+
+def test_shape_change_drops_old_frames():
+    pool = FramePool(count=1)
+    old = pool.acquire(SHAPE)
+    new = pool.acquire((2, 3, 3))
+    pool.release(old)
+    assert pool.acquire((2, 3, 3)) is None
+    pool.release(new)
+    assert pool.acquire((2, 3, 3)) is new
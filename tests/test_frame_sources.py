@@ -0,0 +1,83 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from frame_sources import CameraSource, FramePacket, LandmarkStreamSource, SessionRecorder
+
+
+def record_landmarks(path, times):
+    recorder = SessionRecorder(str(path))
+    hand = np.full((1, 21, 3), 0.5, dtype=np.float32)
+    for index, t in enumerate(times):
+        recorder.write_landmarks(FramePacket(None, t, index), 64, 48, hand)
+    recorder.close()
+
+
+def test_landmark_replay_keeps_recorded_timing(tmp_path):
+    times = [100.0, 100.05, 100.2, 100.25]
+    record_landmarks(tmp_path, times)
+    source = LandmarkStreamSource(str(tmp_path), loop=True)
+    stamps = [source.read().timestamp for _ in range(len(times) * 2)]
+
+    offsets = [stamp - stamps[0] for stamp in stamps]
+    first_loop = [t - times[0] for t in times]
+    # The second pass starts one average frame interval after the last record.
+    second_loop = [0.25 + 0.25 / 3 + offset for offset in first_loop]
+    assert offsets == pytest.approx(first_loop + second_loop)
+
+
+class FakeCapture:
+    """An open device whose grab() and retrieve() results are scripted."""
+
+    def __init__(self, grabs, retrieves=()):
+        self.grabs = list(grabs)
+        self.retrieves = list(retrieves)
+        self.opened = True
+
+    def set(self, prop, value):
+        return True
+
+    def get(self, prop):
+        return 0
+
+    def isOpened(self):
+        return self.opened
+
+    def getBackendName(self):
+        return "FAKE"
+
+    def grab(self):
+        return self.grabs.pop(0) if self.grabs else False
+
+    def retrieve(self, buffer=None):
+        ok = self.retrieves.pop(0) if self.retrieves else True
+        return ok, np.zeros((4, 4, 3), dtype=np.uint8) if ok else None
+
+    def release(self):
+        self.opened = False
+
+
+def open_camera(monkeypatch, capture, max_retries=5):
+    monkeypatch.setattr(CameraSource, "_open", staticmethod(lambda camera_id, backend: capture))
+    return CameraSource(max_retries=max_retries)
+
+
+def test_camera_skips_failed_grabs_and_decodes(monkeypatch):
+    source = open_camera(monkeypatch, FakeCapture([False, True, True, False, True], [False, True]))
+    assert source.read() is not None
+    assert source.take_dropped() == 1
+
+
+def test_camera_open_but_silent_ends_the_stream(monkeypatch):
+    capture = FakeCapture([])
+    source = open_camera(monkeypatch, capture)
+    assert source.read() is None
+    assert capture.isOpened()
+
+
+def test_camera_closed_ends_the_stream(monkeypatch):
+    capture = FakeCapture([])
+    source = open_camera(monkeypatch, capture, max_retries=1000)
+    capture.release()
+    assert source.read() is None
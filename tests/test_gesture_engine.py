@@ -0,0 +1,66 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from conftest import RES_DIR
+from json_manager import JsonManager
+from preset_gestures import GestureEngine, PresetGestures
+
+FRAME_WIDTH, FRAME_HEIGHT = 640, 480
+
+
+def random_hands(count, seed=0):
+    # Spread so that every touch threshold is crossed in both directions.
+    rng = np.random.default_rng(seed)
+    return (0.5 + rng.normal(0.0, 0.06, size=(count, 21, 3))).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def json_manager():
+    return JsonManager(RES_DIR)
+
+
+@pytest.fixture(scope="module")
+def engine(json_manager):
+    names = [gesture["name"] for gesture in json_manager.load_gestures()] + ["dummy", "missing"]
+    return GestureEngine({name: name for name in names}, json_manager)
+
+
+def test_evaluate_matches_preset_gestures(engine, json_manager):
+    for points in random_hands(1000):
+        landmarks = [(i, x, y, z) for i, (x, y, z) in enumerate(points.tolist())]
+        preset = PresetGestures(landmarks, FRAME_WIDTH, FRAME_HEIGHT, json_manager)
+        expected = {name: preset.detect(name) for name in engine.gesture_names}
+        assert engine.evaluate(points, FRAME_WIDTH, FRAME_HEIGHT) == expected
+
+
+def test_batch_matches_single_hand_path(json_manager):
+    # Several hands run vectorized, one hand runs on Python floats: both must agree.
+    names = [gesture["name"] for gesture in json_manager.load_gestures()]
+    engine = GestureEngine({name: name for name in names}, json_manager, hysteresis=1.25)
+    hands = random_hands(500, seed=1)
+    active = np.random.default_rng(2).random((len(hands), len(engine.gesture_names))) < 0.5
+    for use_active in (None, active):
+        batch = engine.evaluate_batch(hands, FRAME_WIDTH, FRAME_HEIGHT, use_active)
+        for index, points in enumerate(hands):
+            row_active = None if use_active is None else use_active[index:index + 1]
+            single = engine.evaluate_batch(points[None], FRAME_WIDTH, FRAME_HEIGHT, row_active)
+            assert batch[index].tolist() == single[0].tolist()
+
+
+def test_hysteresis_keeps_active_gestures(json_manager):
+    engine = GestureEngine({"click": "thumb_index"}, json_manager, hysteresis=1.25)
+    hand = np.full((1, 21, 3), 0.5, dtype=np.float32)
+    # Thumb and index tips 45 px apart: over the 40 px threshold, within 40 * 1.25.
+    hand[0, 8, 0] += 45 / FRAME_WIDTH
+    assert not engine.evaluate_batch(hand, FRAME_WIDTH, FRAME_HEIGHT)[0, 0]
+    assert engine.evaluate_batch(hand, FRAME_WIDTH, FRAME_HEIGHT, np.ones((1, 1), dtype=bool))[0, 0]
+    both = np.concatenate([hand, hand])
+    assert engine.evaluate_batch(both, FRAME_WIDTH, FRAME_HEIGHT, np.array([[True], [False]])).tolist() == [[True], [False]]
+
+
+def test_every_check_type_fires(engine):
+    batch = engine.evaluate_batch(random_hands(1000), FRAME_WIDTH, FRAME_HEIGHT)
+    fired = dict(zip(engine.gesture_names, batch.any(axis=0).tolist()))
+    assert fired["thumb_index"] and fired["dummy"]
+    assert not fired["missing"]
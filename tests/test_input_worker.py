@@ -0,0 +1,36 @@
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from mouse_controller import InputWorker
+
+
+def test_full_queue_never_drops_button_commands():
+    gate = threading.Event()
+    executed = []
+    worker = InputWorker(max_pending=4)
+    worker.submit(gate.wait)
+    for _ in range(10):
+        worker.submit(executed.append, "scroll", droppable=True)
+    worker.submit(executed.append, "press")
+    worker.move(executed.append, "move")
+    worker.submit(executed.append, "release")
+    gate.set()
+    worker.close()
+
+    assert executed[-2:] == ["move", "release"]
+    assert "press" in executed
+    assert worker.stats["dropped"] > 0
+
+
+def test_commands_after_close_run_on_the_caller():
+    executed = []
+    worker = InputWorker()
+    worker.submit(executed.append, "press")
+    worker.close()
+    worker.submit(executed.append, "release")
+    worker.move(executed.append, "move")
+
+    assert executed == ["press", "release", "move"]
@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from conftest import ROOT
+from json_manager import JsonManager
+
+
+def write(path, data):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+
+
+def test_reloads_when_the_file_changes(tmp_path):
+    write(tmp_path / "config.json", {"a": 1})
+    manager = JsonManager(str(tmp_path), check_interval=0.0)
+    assert manager.load_json("config.json") == {"a": 1}
+    revision = manager.revision("config.json")
+
+    # Unchanged file: served from the cache, same revision.
+    assert manager.load_json("config.json") == {"a": 1}
+    assert manager.revision("config.json") == revision
+
+    write(tmp_path / "config.json", {"a": 22})
+    assert manager.load_json("config.json") == {"a": 22}
+    assert manager.revision("config.json") == revision + 1
+
+
+def test_check_interval_limits_stat_calls(tmp_path):
+    write(tmp_path / "config.json", {"a": 1})
+    manager = JsonManager(str(tmp_path), check_interval=60.0)
+    manager.load_json("config.json")
+    write(tmp_path / "config.json", {"a": 22})
+    assert manager.load_json("config.json") == {"a": 1}
+
+
+def test_loaded_data_is_a_copy(tmp_path):
+    write(tmp_path / "config.json", {"a": [1]})
+    manager = JsonManager(str(tmp_path))
+    manager.load_json("config.json")["a"].append(2)
+    assert manager.load_json("config.json") == {"a": [1]}
+
+
+def test_writes_are_buffered_and_flushed_atomically(tmp_path):
+    write(tmp_path / "config.json", {"a": 1})
+    manager = JsonManager(str(tmp_path), check_interval=0.0, write_delay=60.0)
+    manager.save_json("config.json", {"a": 2})
+    manager.save_json("config.json", {"a": 3})
+
+    # Served from memory before it reaches the disk.
+    assert manager.load_json("config.json") == {"a": 3}
+    with open(tmp_path / "config.json", encoding="utf-8") as file:
+        assert json.load(file) == {"a": 1}
+
+    manager.flush()
+    with open(tmp_path / "config.json", encoding="utf-8") as file:
+        assert json.load(file) == {"a": 3}
+    assert os.listdir(tmp_path) == ["config.json"]
+    # Our own write is not mistaken for an external change.
+    revision = manager.revision("config.json")
+    assert manager.load_json("config.json") == {"a": 3}
+    assert manager.revision("config.json") == revision
+
+
+def test_write_behind_timer(tmp_path):
+    manager = JsonManager(str(tmp_path), write_delay=0.01)
+    manager.save_json("new.json", {"b": 1})
+    deadline = time.monotonic() + 2.0
+    while not (tmp_path / "new.json").exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with open(tmp_path / "new.json", encoding="utf-8") as file:
+        assert json.load(file) == {"b": 1}
+
+
+def test_revision_does_not_wait_for_the_disk(tmp_path, monkeypatch):
+    manager = JsonManager(str(tmp_path), write_delay=60.0)
+    manager.save_json("config.json", {"a": 1})
+    writing, release = threading.Event(), threading.Event()
+    write_atomic = manager._write_atomic
+
+    def slow_write(filename, data):
+        writing.set()
+        release.wait(2.0)
+        write_atomic(filename, data)
+
+    monkeypatch.setattr(manager, "_write_atomic", slow_write)
+    flusher = threading.Thread(target=manager.flush)
+    flusher.start()
+    assert writing.wait(2.0)
+    started = time.monotonic()
+    manager.revision("config.json")
+    assert time.monotonic() - started < 0.5
+    release.set()
+    flusher.join()
+
+
+def test_pending_writes_are_flushed_at_exit(tmp_path):
+    script = (
+        "from json_manager import JsonManager\n"
+        f"JsonManager({str(tmp_path)!r}, write_delay=60.0).save_json('exit.json', {{'c': 1}})\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+    with open(tmp_path / "exit.json", encoding="utf-8") as file:
+        assert json.load(file) == {"c": 1}
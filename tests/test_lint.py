@@ -0,0 +1,27 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+pytest.importorskip("pyflakes")
+
+
+def tracked_python_files():
+    # Only what is committed: virtualenvs, build output and other ignored files are not ours to lint.
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    result = subprocess.run(["git", "ls-files", "*.py"], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        pytest.skip("not a git checkout")
+    paths = [os.path.join(ROOT, path) for path in result.stdout.splitlines()]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def test_pyflakes_clean():
+    paths = tracked_python_files()
+    result = subprocess.run([sys.executable, "-m", "pyflakes", *paths], capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -1,5 +1,5 @@
 import tkinter as tk
-from typing import Tuple, Optional
+from typing import Tuple
 
 COLORS = {
     "primary": "#4CAF50",
@@ -7,7 +7,8 @@ COLORS = {
     "success": "green",
     "danger_text": "red",
     "warning": "orange",
-    "white": "white"
+    "white": "white",
+    "muted": "gray"
 }
 
 FONTS = {
@@ -15,6 +16,7 @@ FONTS = {
     "status": ("Arial", 12),
     "status_bold": ("Arial", 12, "bold"),
     "loading": ("Arial", 10),
+    "metrics": ("Arial", 9),
     "button": ("Arial", 14, "bold")
 }
 
@@ -77,3 +79,13 @@ def update_button_state(btn: tk.Button, texts: dict, lang: str, running: bool):
 
 def get_spinner_text(texts: dict, lang: str, spinner_char: str) -> str:
     return f"{texts['ui']['spinner'][lang]} {spinner_char}"
+
+def create_metrics_label(parent: tk.Misc) -> tk.Label:
+    metrics_label = tk.Label(parent, text="", font=FONTS["metrics"], fg=COLORS["muted"])
+    metrics_label.pack(pady=(10, 0))
+    return metrics_label
+
+def get_metrics_text(texts: dict, lang: str, metrics: dict) -> str:
+    latency = metrics.get("latency_p95")
+    latency_text = "-" if latency is None else f"{latency:.0f}"
+    return texts['ui']['metrics'][lang].format(fps=metrics.get("fps", 0.0), latency=latency_text)
@@ -1,28 +1,33 @@
 # ui/ui_manager.py
 import threading
-import queue
 import tkinter as tk
-from typing import Dict, Any
+from collections import deque
 
 from json_manager import JsonManager
 from cli_manager import CLIManager
+from event_bus import EventBus, TOGGLE_CAMERA, CAMERA_STARTING, CAMERA_STATUS, METRICS, UI_CLOSED
 
 from .ui_elements import (
-    COLORS, FONTS, SPINNER_CHARS,
+    COLORS, SPINNER_CHARS,
     create_title, create_status_labels, create_camera_labels, 
-    create_start_button, update_button_state, get_spinner_text
+    create_start_button, update_button_state, get_spinner_text, create_metrics_label, get_metrics_text
 )
 
+BUS_EVENT = "<<BusEvent>>"
+
 
 class UIManager:
-    def __init__(self, json_manager: JsonManager):
+    def __init__(self, json_manager: JsonManager, bus: EventBus | None = None):
         """Ініціалізація UI менеджера"""
         self.json_manager = json_manager
         self.cli_manager = CLIManager(json_manager)
         self.texts = json_manager.load_texts()
         
-        self.ui_to_main = queue.Queue()
-        self.main_to_ui = queue.Queue()
+        # Bus events are collected here and handled on the Tk thread, which
+        # is woken with event_generate instead of polling.
+        self.bus = bus or EventBus()
+        self._inbox = deque()
+        self.bus.subscribe((CAMERA_STARTING, CAMERA_STATUS, METRICS), self._on_bus_event)
         
         self._thread = None
         self._root: tk.Tk | None = None
@@ -36,6 +41,7 @@ class UIManager:
         self.status_label = None
         self.camera_label = None
         self.loading_label = None
+        self.metrics_label = None
         self.start_btn = None
 
     def start(self):
@@ -51,28 +57,30 @@ class UIManager:
             self._root.quit()
             self._root.destroy()
 
-    def send_to_ui(self, data: Dict[str, Any]):
-        try:
-            self.main_to_ui.put_nowait(data)
-        except queue.Full:
-            pass
-
-    def get_signal(self, timeout: float = 0.0) -> Dict[str, Any] | None:
-        try:
-            return self.ui_to_main.get_nowait()
-        except queue.Empty:
-            return None
+    def _on_bus_event(self, event):
+        # Runs on the publisher's thread.
+        self._inbox.append(event)
+        root = self._root
+        if root is not None:
+            try:
+                root.event_generate(BUS_EVENT, when="tail")
+            except (RuntimeError, tk.TclError):
+                # Window is closing; the event is dropped with it.
+                pass
 
     def _ui_mainloop(self):
         self._root = tk.Tk()
         self._root.title("AI Hand Mouse")
-        self._root.geometry("420x280")
+        self._root.geometry("420x310")
         self._root.resizable(False, False)
         
         self._build_ui()
-        self._root.after(50, self._update_from_main)
+        self._root.bind(BUS_EVENT, self._handle_events)
+        # Events published before the window existed.
+        self._handle_events()
         self._root.mainloop()
         self._root = None
+        self.bus.publish(UI_CLOSED)
 
     def _build_ui(self):
         frame = tk.Frame(self._root, padx=20, pady=20)
@@ -88,38 +96,40 @@ class UIManager:
         self.camera_label, self.loading_label = create_camera_labels(status_frame, self.texts, self.lang)
         
         self.start_btn = create_start_button(frame, self._toggle_camera, self.texts, self.lang)
+        self.metrics_label = create_metrics_label(frame)
 
     def _toggle_camera(self):
-        self.ui_to_main.put({"event": "toggle_camera", "data": {}})
+        self.bus.publish(TOGGLE_CAMERA)
 
-    def _update_from_main(self):
-        while True:
-            try:
-                msg = self.main_to_ui.get_nowait()
-                event = msg.get("event")
+    def _handle_events(self, _=None):
+        while self._inbox:
+            event = self._inbox.popleft()
+            
+            if event.kind == CAMERA_STATUS:
+                self.camera_running = event.data["running"]
+                self.loading = False
+                self._update_camera_ui()
                 
-                if event == "camera_status":
-                    self.camera_running = msg["data"]["running"]
-                    self.loading = False
-                    self._update_camera_ui()
-                    
-                elif event == "camera_starting":
+            elif event.kind == CAMERA_STARTING:
+                if not self.loading:
                     self.loading = True
-                    self.camera_label.config(
-                        text=self.texts['ui']['camera']['starting'][self.lang],
-                        fg=COLORS["warning"]
-                    )
-                    
-            except queue.Empty:
-                break
-        
-        if self.loading:
-            self.spinner_index = (self.spinner_index + 1) % 4
-            spinner_text = get_spinner_text(self.texts, self.lang, SPINNER_CHARS[self.spinner_index])
-            self.loading_label.config(text=spinner_text)
-        
-        if self._running and self._root:
-            self._root.after(200, self._update_from_main)
+                    self._spin()
+                self.camera_label.config(
+                    text=self.texts['ui']['camera']['starting'][self.lang],
+                    fg=COLORS["warning"]
+                )
+
+            elif event.kind == METRICS and self.camera_running:
+                self.metrics_label.config(text=get_metrics_text(self.texts, self.lang, event.data))
+
+    def _spin(self):
+        # Scheduled only while loading, so an idle window never wakes up.
+        if not (self.loading and self._running and self._root):
+            return
+        self.spinner_index = (self.spinner_index + 1) % 4
+        spinner_text = get_spinner_text(self.texts, self.lang, SPINNER_CHARS[self.spinner_index])
+        self.loading_label.config(text=spinner_text)
+        self._root.after(200, self._spin)
 
     def _update_camera_ui(self):
         camera_text_key = "running" if self.camera_running else "stopped"
@@ -130,3 +140,5 @@ class UIManager:
         
         update_button_state(self.start_btn, self.texts, self.lang, self.camera_running)
         self.loading_label.config(text="")
+        if not self.camera_running:
+            self.metrics_label.config(text="")
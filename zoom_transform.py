@@ -0,0 +1,30 @@
+import numpy as np
+
+
+class ZoomTransform:
+    """Center zoom as an affine map on normalized coordinates, without resampling pixels."""
+
+    def __init__(self, scale=1.0):
+        self.scale = float(scale)
+        self.offset = 0.5 - 0.5 * self.scale
+
+    def apply(self, points):
+        """Returns a copy of (..., >=2) normalized points with x/y mapped into the zoomed view."""
+        zoomed = np.array(points, dtype=np.float32, copy=True)
+        zoomed[..., :2] = zoomed[..., :2] * self.scale + self.offset
+        return zoomed
+
+    def to_zoomed(self, x, y, frame_width, frame_height):
+        """Maps a frame pixel position to the same pixel grid of the zoomed view."""
+        return (
+            (x / frame_width * self.scale + self.offset) * frame_width,
+            (y / frame_height * self.scale + self.offset) * frame_height,
+        )
+
+    def crop_rect(self, frame_width, frame_height):
+        """The (x0, y0, x1, y1) part of the frame that is visible in the zoomed view."""
+        crop_w = max(1, int(round(frame_width / self.scale)))
+        crop_h = max(1, int(round(frame_height / self.scale)))
+        x0 = (frame_width - crop_w) // 2
+        y0 = (frame_height - crop_h) // 2
+        return x0, y0, x0 + crop_w, y0 + crop_h